@@ -24,10 +24,18 @@ export interface ChatResponse {
 }
 
 /** SSE event types emitted by the streaming chat endpoint. */
-export type SSEEventType = "token" | "tool_call" | "tool_result" | "sources" | "done" | "error";
+export type SSEEventType =
+  | "status"
+  | "token"
+  | "tool_call"
+  | "tool_result"
+  | "sources"
+  | "done"
+  | "error";
 
 export interface SSEEvent {
   type: SSEEventType;
+  stage?: string;
   content?: string;
   tool?: string;
   result?: string;
@@ -6,13 +6,14 @@ Triggered by GCS object creation in the uploads bucket. Pipeline:
   3. Chunk (file-type-aware strategy)
   4. Embed (Vertex AI text-embedding-004)
   5. Store vectors in ChromaDB
-  6. Log result to BigQuery
+  6. Log result to BigQuery (and notify the RAG service, if configured)
 
 Errors are logged to BigQuery with status='error' and re-raised so
 Cloud Functions retries the invocation.
 """
 
 import datetime
+import functools
 import logging
 import os
 import time
@@ -21,6 +22,7 @@ import chromadb
 import functions_framework
 import google.auth.transport.requests
 import google.oauth2.id_token
+import requests
 from cloudevents.http import CloudEvent
 from google.cloud import bigquery, storage
 
@@ -33,6 +35,23 @@ logger.setLevel(logging.INFO)
 
 _COLLECTION_NAME = "labsight_docs"
 _MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB — homelab docs shouldn't be larger
+_NOTIFY_TIMEOUT_SECONDS = 5
+
+
+@functools.lru_cache(maxsize=1)
+def _bigquery_client() -> bigquery.Client:
+    """BigQuery client shared by every invocation on this instance.
+
+    Cloud Functions reuses an instance across events, so building clients
+    once keeps their credentials and connection pools warm.
+    """
+    return bigquery.Client()
+
+
+@functools.lru_cache(maxsize=1)
+def _storage_client() -> storage.Client:
+    """GCS client shared by every invocation on this instance."""
+    return storage.Client()
 
 
 def _get_chromadb_client() -> chromadb.HttpClient:
@@ -58,6 +77,33 @@ def _get_chromadb_client() -> chromadb.HttpClient:
     )
 
 
+def _notify_status(row: dict) -> None:
+    """POST a final ingestion status to the RAG service, best effort.
+
+    Lets /api/upload/status answer waiting polls as soon as ingestion ends.
+    Skipped when STATUS_NOTIFY_URL is unset; failures are logged and never
+    fail the ingestion (the status is already in BigQuery).
+    """
+    service_url = os.environ.get("STATUS_NOTIFY_URL", "").rstrip("/")
+    if not service_url:
+        return
+
+    try:
+        auth_req = google.auth.transport.requests.Request()
+        id_token = google.oauth2.id_token.fetch_id_token(auth_req, service_url)
+        resp = requests.post(
+            f"{service_url}/internal/upload/notify",
+            json=row,
+            headers={"Authorization": f"Bearer {id_token}"},
+            timeout=_NOTIFY_TIMEOUT_SECONDS,
+        )
+        resp.raise_for_status()
+    except Exception:
+        logger.warning(
+            "Failed to notify RAG service for %s", row["file_name"], exc_info=True
+        )
+
+
 def _log_to_bigquery(
     bq_client: bigquery.Client,
     table_id: str,
@@ -73,7 +119,7 @@ def _log_to_bigquery(
     status: str = "success",
     error_message: str | None = None,
 ) -> None:
-    """Insert a row into the ingestion_log BigQuery table."""
+    """Insert a row into the ingestion_log BigQuery table, then notify."""
     row = {
         "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         "file_name": file_name,
@@ -90,6 +136,7 @@ def _log_to_bigquery(
     errors = bq_client.insert_rows_json(table_id, [row])
     if errors:
         logger.error("BigQuery insert errors: %s", errors)
+    _notify_status(row)
 
 
 @functions_framework.cloud_event
@@ -105,7 +152,7 @@ def process_document(cloud_event: CloudEvent) -> None:
 
     logger.info("Processing %s from bucket %s", file_name, bucket_name)
 
-    bq_client = bigquery.Client()
+    bq_client = _bigquery_client()
     table_id = os.environ["BIGQUERY_TABLE"]
     file_size_bytes = int(data.get("size", 0))
 
@@ -129,7 +176,7 @@ def process_document(cloud_event: CloudEvent) -> None:
 
     try:
         # 1. Download from GCS
-        gcs_client = storage.Client()
+        gcs_client = _storage_client()
         bucket = gcs_client.bucket(bucket_name)
         blob = bucket.blob(file_name)
         content = blob.download_as_text()
@@ -21,7 +21,7 @@ sys.path.insert(0, str(ROOT / "service"))
 
 from app.config import Settings
 from app.rag.reranker import BaseReranker, CrossEncoderReranker, NoOpReranker
-from app.rag.retriever import ChromaDBRetriever
+from app.rag.retriever import ChromaDBRetriever, clear_query_embedding_cache
 
 
 @dataclass
@@ -149,6 +149,9 @@ def evaluate_retrieval(
 
     settings.retrieval_candidate_k = candidate_k
     retriever = ChromaDBRetriever(settings=settings)
+    # Each run measures cold retrieval latency; don't let an earlier sweep
+    # configuration's cached query embeddings skew the numbers.
+    clear_query_embedding_cache()
     reranker, effective_mode, notes = build_reranker(
         mode=reranker_mode,
         model_name=reranker_model,
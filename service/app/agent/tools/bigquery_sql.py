@@ -20,6 +20,7 @@ Safety layers (defense-in-depth; IAM dataViewer is the primary enforcement):
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
 from typing import Any
@@ -130,6 +131,12 @@ class SQLValidationError(Exception):
     """Raised when SQL fails validation."""
 
 
+@functools.lru_cache(maxsize=8)
+def _lowered_tables(allowed_tables: frozenset[str]) -> frozenset[str]:
+    """Lowercased allowlist, computed once per distinct (immutable) set."""
+    return frozenset(t.lower() for t in allowed_tables)
+
+
 def validate_sql(
     sql: str,
     allowed_project: str,
@@ -212,9 +219,7 @@ def validate_sql(
     # 6. Table allowlist
     allowed_project_lower = allowed_project.lower()
     allowed_dataset_lower = allowed_dataset.lower()
-    allowed_tables_lower = (
-        frozenset(t.lower() for t in allowed_tables) if allowed_tables else frozenset()
-    )
+    allowed_tables_lower = _lowered_tables(allowed_tables or frozenset())
     is_strict = policy_mode == "strict"
 
     real_table_count = 0
@@ -299,6 +304,17 @@ def create_bigquery_tool(
         f"- A LIMIT of 1000 is auto-appended if you don't specify one."
     )
 
+    @functools.cache
+    def bigquery_client() -> Any:
+        """The tool's BigQuery client, built on first use and then reused.
+
+        Constructing a client per call would redo credential loading and
+        open a fresh connection pool every time the agent runs a query.
+        """
+        from google.cloud import bigquery
+
+        return bigquery.Client(project=project_id)
+
     @tool(description=docstring)
     def query_infrastructure_metrics(sql: str) -> ToolResult:
         """Execute a read-only BigQuery SQL query."""
@@ -316,7 +332,7 @@ def create_bigquery_tool(
         try:
             from google.cloud import bigquery
 
-            bq_client = bigquery.Client(project=project_id)
+            bq_client = bigquery_client()
             job_config = bigquery.QueryJobConfig(
                 maximum_bytes_billed=max_bytes_billed,
                 default_dataset=f"{project_id}.{dataset_id}",
@@ -5,12 +5,21 @@ or defaults. All settings are validated at startup — fail fast if
 something critical is missing.
 """
 
+import functools
 from typing import Literal
 
-from pydantic import model_validator
+from pydantic import PrivateAttr, model_validator
 from pydantic_settings import BaseSettings
 
 
+@functools.lru_cache(maxsize=8)
+def _chromadb_parts(url: str) -> tuple[str, int, bool]:
+    """Split a ChromaDB URL into (host, port, ssl) for the client."""
+    ssl = url.startswith("https")
+    host = url.replace("https://", "").replace("http://", "").rstrip("/")
+    return host, 443 if ssl else 8000, ssl
+
+
 class Settings(BaseSettings):
     """RAG service configuration."""
 
@@ -40,6 +49,8 @@ class Settings(BaseSettings):
     rerank_enabled: bool = False
     reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     reranker_max_candidates: int = 30
+    # int8 ONNX export, baked into the image by the Dockerfile (RERANKER_MODEL)
+    reranker_onnx_cache_dir: str = "/app/reranker-onnx"
 
     # Input validation
     max_query_length: int = 1000
@@ -55,6 +66,16 @@ class Settings(BaseSettings):
     gcs_uploads_bucket: str = ""
     bigquery_observability_dataset: str = ""
     max_upload_size_bytes: int = 10_485_760  # 10 MB
+    # /api/upload/status holds a "processing" poll open this long waiting
+    # for the ingestion function's completion notice. Off (0) unless the
+    # function is configured to notify (STATUS_NOTIFY_URL); terraform sets
+    # both together.
+    upload_status_wait_seconds: float = 0.0
+    # Service account allowed to POST /internal/upload/notify (the
+    # ingestion function's); empty rejects every notice
+    upload_notify_sa_email: str = ""
+    # Dashboard overview responses are shared for this long (0 disables)
+    dashboard_cache_ttl_seconds: float = 30.0
     allowed_upload_extensions: str = (
         "md,yaml,yml,json,txt,conf,cfg,ini,toml,dockerfile,sh,xml,csv,properties"
     )
@@ -68,6 +89,12 @@ class Settings(BaseSettings):
     sql_policy_mode: Literal["strict", "flex"] = "strict"
     sql_allowed_tables: str = "uptime_events,resource_utilization,service_inventory"
 
+    # Parsed allowlists, keyed on the raw string they came from so a
+    # model_copy(update=...) with a new value is re-parsed (see _csv_set)
+    _parsed_sets: dict[str, tuple[str, frozenset[str]]] = PrivateAttr(
+        default_factory=dict
+    )
+
     @model_validator(mode="after")
     def _validate_sql_policy(self) -> "Settings":
         """Strict SQL policy requires a non-empty table allowlist."""
@@ -80,8 +107,7 @@ class Settings(BaseSettings):
             )
 
         if self.sql_policy_mode == "strict":
-            tables = [t.strip() for t in self.sql_allowed_tables.split(",") if t.strip()]
-            if not tables:
+            if not self.get_allowed_tables_set():
                 raise ValueError(
                     "sql_allowed_tables must not be empty when sql_policy_mode is 'strict'. "
                     "Provide a comma-separated list of allowed table names, or set "
@@ -89,16 +115,42 @@ class Settings(BaseSettings):
                 )
         return self
 
+    @property
+    def chromadb_host(self) -> str:
+        """chromadb_url without scheme or trailing slash."""
+        return _chromadb_parts(self.chromadb_url)[0]
+
+    @property
+    def chromadb_port(self) -> int:
+        """443 for https URLs, otherwise ChromaDB's default 8000."""
+        return _chromadb_parts(self.chromadb_url)[1]
+
+    @property
+    def chromadb_ssl(self) -> bool:
+        """Whether chromadb_url uses https."""
+        return _chromadb_parts(self.chromadb_url)[2]
+
+    def _csv_set(self, field: str, *, lower: bool = False) -> frozenset[str]:
+        """Parse a comma-separated setting into a frozenset, once per value."""
+        raw = getattr(self, field)
+        cached = self._parsed_sets.get(field)
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+        items = (item.strip() for item in raw.split(","))
+        parsed = frozenset(
+            (item.lower() if lower else item) for item in items if item
+        )
+        self._parsed_sets[field] = (raw, parsed)
+        return parsed
+
     def get_allowed_tables_set(self) -> frozenset[str]:
         """Parse sql_allowed_tables into a frozenset for use by the SQL validator."""
-        return frozenset(
-            t.strip() for t in self.sql_allowed_tables.split(",") if t.strip()
-        )
+        return self._csv_set("sql_allowed_tables")
 
     def get_allowed_extensions_set(self) -> frozenset[str]:
-        """Parse allowed_upload_extensions into a frozenset."""
-        return frozenset(
-            ext.strip().lower()
-            for ext in self.allowed_upload_extensions.split(",")
-            if ext.strip()
-        )
+        """Parse allowed_upload_extensions into a frozenset.
+
+        Checked on every upload, so the parsed set is reused until the
+        setting changes.
+        """
+        return self._csv_set("allowed_upload_extensions", lower=True)
@@ -2,10 +2,17 @@
 
 Applied before any LLM call to reject malformed or suspicious queries.
 Raises HTTPException(400) so FastAPI returns a clean error response.
+
+Validation is pure, so accepted queries are memoized: clients that retry
+or resend the same question skip the regex scan. Rejections are never
+cached (lru_cache does not store exceptions), and only queries up to
+_CACHEABLE_QUERY_LENGTH characters are kept to bound the cache footprint.
 """
 
+import functools
 import re
 
+import ahocorasick
 from fastapi import HTTPException
 
 # Patterns that suggest prompt injection attempts. These are basic
@@ -17,6 +24,20 @@ _INJECTION_PATTERNS = [
     re.compile(r"<\s*/?\s*system\s*>", re.IGNORECASE),
 ]
 
+# Literal substrings that every injection pattern above must contain. An
+# Aho-Corasick scan over the casefolded query finds them in one linear pass,
+# so benign queries skip the regex engine entirely. Keywords avoid "i"
+# because re.IGNORECASE matches dotless "ı" to it but casefold() does not;
+# casefold() does map the other case-insensitive equivalents ("ſ" -> "s").
+_PREFILTER_KEYWORDS = ("gnore", "now", "system")
+_PREFILTER = ahocorasick.Automaton()
+for _keyword in _PREFILTER_KEYWORDS:
+    _PREFILTER.add_word(_keyword, _keyword)
+_PREFILTER.make_automaton()
+
+_CACHE_SIZE = 512
+_CACHEABLE_QUERY_LENGTH = 2048
+
 
 def validate_query(query: str, max_length: int) -> str:
     """Validate and sanitize an incoming query string.
@@ -24,6 +45,13 @@ def validate_query(query: str, max_length: int) -> str:
     Returns the stripped query on success.
     Raises HTTPException(400) on validation failure.
     """
+    if len(query) <= _CACHEABLE_QUERY_LENGTH:
+        return _validate_cached(query, max_length)
+    return _validate(query, max_length)
+
+
+def _validate(query: str, max_length: int) -> str:
+    """Uncached validation — raises a fresh HTTPException on every reject."""
     stripped = query.strip()
 
     if not stripped:
@@ -35,6 +63,9 @@ def validate_query(query: str, max_length: int) -> str:
             detail=f"Query exceeds maximum length of {max_length} characters.",
         )
 
+    if next(_PREFILTER.iter(stripped.casefold()), None) is None:
+        return stripped
+
     for pattern in _INJECTION_PATTERNS:
         if pattern.search(stripped):
             raise HTTPException(
@@ -43,3 +74,8 @@ def validate_query(query: str, max_length: int) -> str:
             )
 
     return stripped
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _validate_cached(query: str, max_length: int) -> str:
+    return _validate(query, max_length)
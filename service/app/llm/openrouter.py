@@ -6,7 +6,6 @@ existing OpenRouter credits for Claude access.
 """
 
 from langchain_core.language_models import BaseChatModel
-from langchain_openai import ChatOpenAI
 
 from app.config import Settings
 from app.llm.provider import LLMProvider
@@ -20,6 +19,9 @@ class OpenRouterProvider(LLMProvider):
         self._api_key = settings.openrouter_api_key
 
     def get_chat_model(self) -> BaseChatModel:
+        # Imported here so the SDK only loads for the configured provider.
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model=self._model_name,
             openai_api_key=self._api_key,
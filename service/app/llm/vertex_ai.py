@@ -6,7 +6,6 @@ good enough for RAG synthesis.
 """
 
 from langchain_core.language_models import BaseChatModel
-from langchain_google_vertexai import ChatVertexAI
 
 from app.config import Settings
 from app.llm.provider import LLMProvider
@@ -19,6 +18,9 @@ class VertexAIProvider(LLMProvider):
         self._location = settings.gcp_region
 
     def get_chat_model(self) -> BaseChatModel:
+        # Imported here so the SDK only loads for the configured provider.
+        from langchain_google_vertexai import ChatVertexAI
+
         return ChatVertexAI(
             model_name=self._model_name,
             project=self._project,
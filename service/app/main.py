@@ -13,14 +13,18 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.config import Settings
 from app.llm.provider import create_provider
+from app.middleware.body_limit import MULTIPART_OVERHEAD_BYTES, BodySizeLimitMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.observability.logger import drain_pending_logs
 from app.rag.chain import RAGChain
-from app.rag.reranker import CrossEncoderReranker, NoOpReranker
+from app.rag.reranker import NoOpReranker
 from app.rag.retriever import ChromaDBRetriever
 from app.routers import chat, dashboard, health, upload
+from app.utils import file_too_large_detail
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,13 +36,24 @@ async def lifespan(app: FastAPI):
     settings = Settings()
     provider = create_provider(settings)
     retriever = ChromaDBRetriever(settings=settings)
+    try:
+        retriever.warm_up()
+    except Exception:
+        # Not fatal: the first query retries the lazy init and surfaces
+        # the error through the normal request path.
+        logger.exception("Retriever warm-up failed; continuing with lazy init")
     llm = provider.get_chat_model()
     reranker = NoOpReranker()
     if settings.rerank_enabled:
+        # Deferred so cold starts without reranking never load the
+        # cross-encoder's module graph.
+        from app.rag.reranker import CrossEncoderReranker
+
         try:
             reranker = CrossEncoderReranker(
                 model_name=settings.reranker_model,
                 max_candidates=settings.reranker_max_candidates,
+                onnx_cache_dir=settings.reranker_onnx_cache_dir,
             )
             reranker.ensure_ready()
             logger.info(
@@ -71,12 +86,15 @@ async def lifespan(app: FastAPI):
         from app.agent.tools.bigquery_sql import create_bigquery_tool
         from app.agent.tools.vector_retrieval import create_retrieval_tool
 
+        # Parsed once at startup; the tool closes over this frozenset for
+        # every per-query membership check.
+        allowed_tables = settings.get_allowed_tables_set()
         bq_tool = create_bigquery_tool(
             project_id=settings.gcp_project,
             dataset_id=settings.bigquery_metrics_dataset,
             max_bytes_billed=settings.bigquery_max_bytes_billed,
             policy_mode=settings.sql_policy_mode,
-            allowed_tables=settings.get_allowed_tables_set(),
+            allowed_tables=allowed_tables,
         )
         retrieval_tool = create_retrieval_tool(retriever)
         agent = create_labsight_agent(llm, [bq_tool, retrieval_tool])
@@ -96,12 +114,17 @@ async def lifespan(app: FastAPI):
     )
     yield
 
+    # Query logs are written fire-and-forget; give in-flight inserts a
+    # chance to land before the instance shuts down.
+    await drain_pending_logs()
+
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Labsight RAG Service",
         description="AI-powered operations assistant for homelab infrastructure",
         version="0.5.0",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan,
     )
 
@@ -115,6 +138,18 @@ def create_app() -> FastAPI:
         },
     )
 
+    # Turn away uploads whose declared size is already over the limit
+    # before the multipart body is received
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        rules={
+            "/api/upload": (
+                settings.max_upload_size_bytes + MULTIPART_OVERHEAD_BYTES,
+                file_too_large_detail(settings.max_upload_size_bytes),
+            ),
+        },
+    )
+
     app.include_router(health.router)
     app.include_router(chat.router)
     app.include_router(upload.router)
@@ -0,0 +1,55 @@
+"""Reject oversized request bodies from their Content-Length header.
+
+FastAPI parses a multipart body (spooling the file to disk) before the
+route handler runs, so a size check inside the handler only fires after
+the whole upload has been received. Checking the declared length here
+turns an obviously oversized upload away before any of it is read.
+"""
+
+from __future__ import annotations
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.responses import JSONResponse
+
+# Allowance for multipart framing (boundaries, part headers) on top of the
+# file itself, so a file right at the limit isn't rejected here.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class BodySizeLimitMiddleware(BaseHTTPMiddleware):
+    """Return 413 when a request declares a body larger than its path allows.
+
+    Parameters
+    ----------
+    rules : dict[str, tuple[int, str]]
+        Mapping of exact path → (max Content-Length in bytes, 413 detail).
+        Example: ``{"/api/upload": (10 * 1024 * 1024, "Too large.")}``
+        The detail should match the route handler's own size error, so
+        the client gets one error contract. Requests without a
+        Content-Length (chunked) pass through; the route handler still
+        enforces the real limit on the file itself.
+    """
+
+    def __init__(self, app: object, *, rules: dict[str, tuple[int, str]]) -> None:
+        super().__init__(app)  # type: ignore[arg-type]
+        self.rules = rules
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        rule = self.rules.get(request.url.path)
+        if rule is None:
+            return await call_next(request)
+        limit, detail = rule
+
+        content_length = request.headers.get("content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > limit:
+                return JSONResponse(
+                    status_code=413,
+                    content={"detail": detail},
+                    headers={"Connection": "close"},
+                )
+
+        return await call_next(request)
@@ -3,16 +3,34 @@
 Best-effort: if the table isn't configured or the insert fails, we log
 the error and move on. A failed analytics write should never break a
 user query.
+
+Request handlers use log_query_background so the BigQuery insert runs in
+a worker thread after the response is on its way, instead of adding its
+round-trip to user-observed latency.
 """
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import functools
 import logging
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Strong references to in-flight log tasks; the event loop only keeps
+# weak ones, so an unreferenced task could be collected mid-insert.
+_pending_logs: set[asyncio.Task[None]] = set()
+
+
+@functools.lru_cache(maxsize=1)
+def _bigquery_client() -> Any:
+    """Shared BigQuery client for log inserts (built on first use)."""
+    from google.cloud import bigquery
+
+    return bigquery.Client()
+
 
 def log_query(
     table_id: str,
@@ -34,9 +52,7 @@ def log_query(
         return
 
     try:
-        from google.cloud import bigquery
-
-        bq_client = bigquery.Client()
+        bq_client = _bigquery_client()
 
         row: dict[str, Any] = {
             "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
@@ -56,3 +72,31 @@ def log_query(
 
     except Exception:
         logger.exception("Failed to log query to BigQuery")
+
+
+def log_query_background(table_id: str, **fields: Any) -> None:
+    """Schedule log_query on a worker thread without awaiting it.
+
+    Falls back to a synchronous insert when called outside an event loop.
+    """
+    if not table_id:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        log_query(table_id, **fields)
+        return
+
+    task = loop.create_task(asyncio.to_thread(log_query, table_id, **fields))
+    _pending_logs.add(task)
+    task.add_done_callback(_pending_logs.discard)
+
+
+async def drain_pending_logs(timeout: float = 5.0) -> None:
+    """Wait (bounded) for in-flight background log inserts, e.g. at shutdown."""
+    if not _pending_logs:
+        return
+    _, still_pending = await asyncio.wait(set(_pending_logs), timeout=timeout)
+    if still_pending:
+        logger.warning("Dropped %d query log writes at shutdown", len(still_pending))
@@ -5,26 +5,28 @@ about homelab infrastructure using retrieved document context. Every
 claim must be cited with [Source N] references.
 
 Supports two modes:
-  - invoke(): returns a complete RAGResponse with answer + sources
+  - invoke() / ainvoke(): returns a complete RAGResponse with answer + sources
   - stream(): yields SSE-formatted events for real-time streaming
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
 import logging
 import time
 from dataclasses import dataclass, field
 from pathlib import PurePath
-from typing import AsyncIterator
+from typing import AsyncIterator, Awaitable
 
 from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.retrievers import BaseRetriever
 
 from app.rag.reranker import BaseReranker, NoOpReranker
-from app.utils import sse_event as _sse
+from app.utils import StreamEvent
+from app.utils import stream_event as _event
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,8 @@ Rules:
 the original values.
 """
 
+_NO_DOCUMENTS_ANSWER = "I couldn't find any relevant documents to answer your question."
+
 
 @dataclass
 class SourceDocument:
@@ -117,10 +121,28 @@ class RAGChain:
         self._model_name = model_name
         self._reranker = reranker or NoOpReranker()
         self._retrieval_final_k = retrieval_final_k
+        # Same prompt for every query — build the message once and share it.
+        self._system_message = SystemMessage(content=_SYSTEM_PROMPT)
 
     def _select_documents(self, query: str) -> list[Document]:
         """Retrieve candidates and rerank/select final docs."""
-        candidate_docs = self._retriever.invoke(query)
+        return self._rerank_candidates(query, self._retriever.invoke(query))
+
+    async def _aselect_documents(self, query: str) -> list[Document]:
+        """Async variant of _select_documents.
+
+        Retrieval goes through the retriever's native async path; the
+        (possibly CPU-bound) rerank step runs in a worker thread.
+        """
+        candidate_docs = await self._retriever.ainvoke(query)
+        if not candidate_docs:
+            return []
+        return await asyncio.to_thread(self._rerank_candidates, query, candidate_docs)
+
+    def _rerank_candidates(
+        self, query: str, candidate_docs: list[Document]
+    ) -> list[Document]:
+        """Rerank candidates, falling back to ANN order if the reranker fails."""
         if not candidate_docs:
             return []
 
@@ -145,79 +167,112 @@ class RAGChain:
         )
         return final_docs
 
-    def invoke(self, query: str) -> RAGResponse:
-        """Run the full RAG pipeline and return a complete response."""
-        start = time.monotonic()
-
-        documents = self._select_documents(query)
-        if not documents:
-            return RAGResponse(
-                answer="I couldn't find any relevant documents to answer your question.",
-                sources=[],
-                model=self._model_name,
-                latency_ms=(time.monotonic() - start) * 1000,
-                retrieval_count=0,
-            )
-
-        # Build context and generate
+    def _generation_input(
+        self, query: str, documents: list[Document]
+    ) -> tuple[list[BaseMessage], list[SourceDocument]]:
+        """Build the LLM messages and the cited source list for documents."""
         context, sources = _format_context(documents)
         messages = [
-            SystemMessage(content=_SYSTEM_PROMPT),
+            self._system_message,
             HumanMessage(
                 content=f"Context:\n{context}\n\nQuestion: {query}"
             ),
         ]
+        return messages, sources
 
-        response = self._llm.invoke(messages)
+    def _response(
+        self, start: float, answer: str, sources: list[SourceDocument]
+    ) -> RAGResponse:
+        """Wrap a generated answer (or the no-documents fallback)."""
         latency_ms = (time.monotonic() - start) * 1000
-
-        logger.info(
-            "RAG query completed in %.0fms (model=%s, sources=%d)",
-            latency_ms,
-            self._model_name,
-            len(sources),
-        )
-
+        if sources:
+            logger.info(
+                "RAG query completed in %.0fms (model=%s, sources=%d)",
+                latency_ms,
+                self._model_name,
+                len(sources),
+            )
         return RAGResponse(
-            answer=response.content,
+            answer=answer,
             sources=sources,
             model=self._model_name,
             latency_ms=latency_ms,
-            retrieval_count=len(documents),
+            retrieval_count=len(sources),
         )
 
-    async def stream(self, query: str) -> AsyncIterator[str]:
-        """Stream SSE events: token chunks followed by a final sources event.
+    def invoke(self, query: str) -> RAGResponse:
+        """Run the full RAG pipeline and return a complete response."""
+        start = time.monotonic()
+
+        documents = self._select_documents(query)
+        if not documents:
+            return self._response(start, _NO_DOCUMENTS_ANSWER, [])
+
+        messages, sources = self._generation_input(query, documents)
+        response = self._llm.invoke(messages)
+        return self._response(start, response.content, sources)
+
+    async def ainvoke(self, query: str) -> RAGResponse:
+        """Async invoke(): retrieval and generation without blocking the loop.
 
-        Event format:
+        Uses the same async retrieval as stream(), then the model's async
+        completion.
+        """
+        start = time.monotonic()
+
+        documents = await self._aselect_documents(query)
+        if not documents:
+            return self._response(start, _NO_DOCUMENTS_ANSWER, [])
+
+        messages, sources = self._generation_input(query, documents)
+        response = await self._llm.ainvoke(messages)
+        return self._response(start, response.content, sources)
+
+    async def stream(
+        self,
+        query: str,
+        prefetch: Awaitable[object] | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """Stream events: token chunks followed by a final sources event.
+
+        Each item is a StreamEvent carrying both the payload dict and its
+        pre-serialized SSE bytes, so wrappers can inspect events without
+        re-parsing what was just serialized. On the wire (event.sse):
+          data: {"type": "status", "stage": "retrieving"}
           data: {"type": "token", "content": "..."}
           data: {"type": "sources", "sources": [...]}
           data: {"type": "done", "model": "...", "latency_ms": ...}
 
+        Retrieval uses the retriever's async path and reranking runs in a
+        worker thread, keeping the event loop free. The status event goes
+        out first so the client has something to render and proxies don't
+        idle-timeout while retrieval is in flight.
+
+        `prefetch` is an in-flight warm-up (e.g. the query embedding started
+        by the endpoint) that is awaited before retrieval so its result is
+        reused rather than recomputed. Its failure is ignored; retrieval
+        redoes the work and surfaces the error.
+
         On error, yields an error event + done so the frontend never hangs.
         """
         start = time.monotonic()
 
         try:
-            documents = self._select_documents(query)
+            yield _event({"type": "status", "stage": "retrieving"})
+            if prefetch is not None:
+                with contextlib.suppress(Exception):
+                    await prefetch
+            documents = await self._aselect_documents(query)
             if not documents:
-                yield _sse(
-                    {"type": "token", "content": "I couldn't find any relevant documents to answer your question."}
-                )
-                yield _sse({"type": "done", "model": self._model_name, "latency_ms": 0, "retrieval_count": 0})
+                yield _event({"type": "token", "content": _NO_DOCUMENTS_ANSWER})
+                yield _event({"type": "done", "model": self._model_name, "latency_ms": 0, "retrieval_count": 0})
                 return
 
-            context, sources = _format_context(documents)
-            messages = [
-                SystemMessage(content=_SYSTEM_PROMPT),
-                HumanMessage(
-                    content=f"Context:\n{context}\n\nQuestion: {query}"
-                ),
-            ]
+            messages, sources = self._generation_input(query, documents)
 
             async for chunk in self._llm.astream(messages):
                 if chunk.content:
-                    yield _sse({"type": "token", "content": chunk.content})
+                    yield _event({"type": "token", "content": chunk.content})
 
             # Send sources after all tokens
             sources_payload = [
@@ -229,10 +284,10 @@ class RAGChain:
                 }
                 for s in sources
             ]
-            yield _sse({"type": "sources", "sources": sources_payload})
+            yield _event({"type": "sources", "sources": sources_payload})
 
             latency_ms = (time.monotonic() - start) * 1000
-            yield _sse({
+            yield _event({
                 "type": "done",
                 "model": self._model_name,
                 "latency_ms": round(latency_ms, 1),
@@ -242,8 +297,8 @@ class RAGChain:
         except Exception:
             logger.exception("Error during streaming RAG query")
             latency_ms = (time.monotonic() - start) * 1000
-            yield _sse({"type": "error", "message": "An internal error occurred while generating a response."})
-            yield _sse({
+            yield _event({"type": "error", "message": "An internal error occurred while generating a response."})
+            yield _event({
                 "type": "done",
                 "model": self._model_name,
                 "latency_ms": round(latency_ms, 1),
@@ -4,15 +4,70 @@ Phase 6 introduces optional reranking after ANN retrieval:
 1) Vector search gets fast candidates.
 2) Cross-encoder reranker re-scores candidates for relevance.
 3) Top reranked docs are passed to the LLM prompt.
+
+The cross-encoder prefers an int8-quantized ONNX Runtime export of the
+model (optional ``optimum[onnxruntime]`` dependency) and falls back to
+sentence-transformers' PyTorch CrossEncoder when it isn't installed or
+the export can't be loaded.
+
+The export is a build-time step: Cloud Run's filesystem is in-memory and
+per-instance, so an export written at runtime is redone on every cold
+start. The service Dockerfile bakes it into the image when built with
+``--build-arg RERANKER_MODEL=...``, running::
+
+    python -m app.rag.reranker <model_name> <cache_dir>
 """
 
 from __future__ import annotations
 
+import logging
+import re
+import sys
 from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import Any
 
 from langchain_core.documents import Document
 
+logger = logging.getLogger(__name__)
+
+# Where the Dockerfile bakes the export (see module docstring)
+_DEFAULT_ONNX_CACHE_DIR = "/app/reranker-onnx"
+_QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def _onnx_model_dir(model_name: str, cache_dir: str) -> Path:
+    """Directory holding model_name's ONNX export under cache_dir."""
+    return Path(cache_dir) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+
+def export_onnx_model(model_name: str, cache_dir: str) -> Path:
+    """Export model_name to int8 ONNX under cache_dir, unless already there.
+
+    Returns the model directory. Needs optimum[onnxruntime].
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model_dir = _onnx_model_dir(model_name, cache_dir)
+    if (model_dir / _QUANTIZED_FILE_NAME).exists():
+        return model_dir
+
+    logger.info("Exporting %s to int8 ONNX at %s", model_name, model_dir)
+    exported = ORTModelForSequenceClassification.from_pretrained(
+        model_name, export=True
+    )
+    exported.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+    ORTQuantizer.from_pretrained(exported).quantize(
+        save_dir=model_dir,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(
+            is_static=False, per_channel=False
+        ),
+    )
+    return model_dir
+
 
 class BaseReranker(ABC):
     """Interface for reranking retrieved documents."""
@@ -29,27 +84,68 @@ class NoOpReranker(BaseReranker):
         del query  # unused by no-op implementation
         reranked: list[Document] = []
 
-        for retrieval_rank, doc in enumerate(docs, start=1):
-            metadata = dict(doc.metadata or {})
-            metadata.setdefault("retrieval_rank", retrieval_rank)
-            metadata.setdefault("rerank_rank", retrieval_rank)
-            metadata.setdefault(
-                "rerank_score",
-                float(metadata.get("similarity_score", 0.0)),
-            )
+        for retrieval_rank, doc in enumerate(docs[:top_k], start=1):
+            metadata = doc.metadata if isinstance(doc.metadata, dict) else {}
+            # Existing keys win (setdefault semantics); a single dict display
+            # builds the new mapping without aliasing the retriever's dict.
             reranked.append(
-                Document(page_content=doc.page_content, metadata=metadata)
+                Document(
+                    page_content=doc.page_content,
+                    metadata={
+                        "retrieval_rank": retrieval_rank,
+                        "rerank_rank": retrieval_rank,
+                        "rerank_score": float(metadata.get("similarity_score", 0.0)),
+                        **metadata,
+                    },
+                )
             )
 
-        return reranked[:top_k]
+        return reranked
 
 
-class CrossEncoderReranker(BaseReranker):
-    """Cross-encoder reranker using sentence-transformers."""
+class _ONNXCrossEncoder:
+    """Minimal stand-in for ``CrossEncoder.predict`` on ONNX Runtime.
+
+    Single-logit relevance models get the same sigmoid activation that
+    sentence-transformers applies, so rerank scores stay comparable
+    across backends.
+    """
+
+    def __init__(self, model: Any, tokenizer: Any) -> None:
+        self._model = model
+        self._tokenizer = tokenizer
 
-    def __init__(self, model_name: str, max_candidates: int = 30) -> None:
+    def predict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        import numpy as np
+
+        if not pairs:
+            return []
+
+        features = self._tokenizer(
+            [query for query, _ in pairs],
+            [text for _, text in pairs],
+            padding=True,
+            truncation=True,
+            return_tensors="np",
+        )
+        logits = np.asarray(self._model(**features).logits, dtype=np.float32)
+        if logits.ndim == 2 and logits.shape[1] == 1:
+            return (1.0 / (1.0 + np.exp(-logits[:, 0]))).tolist()
+        return logits[:, -1].tolist()
+
+
+class CrossEncoderReranker(BaseReranker):
+    """Cross-encoder reranker (ONNX Runtime int8, or sentence-transformers)."""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_candidates: int = 30,
+        onnx_cache_dir: str = _DEFAULT_ONNX_CACHE_DIR,
+    ) -> None:
         self._model_name = model_name
         self._max_candidates = max_candidates
+        self._onnx_cache_dir = onnx_cache_dir
         self._model: Any = None
 
     def ensure_ready(self) -> None:
@@ -57,21 +153,60 @@ class CrossEncoderReranker(BaseReranker):
         _ = self._get_model()
 
     def _get_model(self) -> Any:
-        """Lazy-load the cross-encoder model."""
+        """Lazy-load the cross-encoder model, preferring ONNX Runtime."""
         if self._model is not None:
             return self._model
 
+        try:
+            self._model = self._load_onnx_model()
+            return self._model
+        except ModuleNotFoundError:
+            logger.info(
+                "optimum[onnxruntime] not installed; using sentence-transformers reranker"
+            )
+        except Exception:
+            logger.exception(
+                "ONNX reranker export/load failed; using sentence-transformers reranker"
+            )
+
         try:
             from sentence_transformers import CrossEncoder
         except ModuleNotFoundError as exc:
             raise RuntimeError(
-                "CrossEncoder reranker requires sentence-transformers. "
-                "Install it in the service image or set LABSIGHT_RERANK_ENABLED=false."
+                "CrossEncoder reranker requires optimum[onnxruntime] or "
+                "sentence-transformers. Install one in the service image or set "
+                "LABSIGHT_RERANK_ENABLED=false."
             ) from exc
 
         self._model = CrossEncoder(self._model_name)
         return self._model
 
+    def _load_onnx_model(self) -> _ONNXCrossEncoder:
+        """Load the int8 ONNX export from onnx_cache_dir.
+
+        Normally baked into the image at build time. If it's missing, the
+        export runs here instead, which costs a download and quantization
+        on every cold start.
+        """
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        model_dir = _onnx_model_dir(self._model_name, self._onnx_cache_dir)
+        if not (model_dir / _QUANTIZED_FILE_NAME).exists():
+            logger.warning(
+                "No prebuilt ONNX reranker at %s; exporting at startup "
+                "(build the image with RERANKER_MODEL to avoid this)",
+                model_dir,
+            )
+            export_onnx_model(self._model_name, self._onnx_cache_dir)
+
+        model = ORTModelForSequenceClassification.from_pretrained(
+            model_dir,
+            file_name=_QUANTIZED_FILE_NAME,
+            provider="CPUExecutionProvider",
+        )
+        return _ONNXCrossEncoder(model, AutoTokenizer.from_pretrained(model_dir))
+
     def rerank(self, query: str, docs: list[Document], top_k: int) -> list[Document]:
         if not docs:
             return []
@@ -87,13 +222,26 @@ class CrossEncoderReranker(BaseReranker):
         scored_docs.sort(key=lambda item: item[1], reverse=True)
 
         reranked: list[Document] = []
-        for rerank_rank, (retrieval_rank, score, doc) in enumerate(scored_docs, start=1):
-            metadata = dict(doc.metadata or {})
-            metadata["retrieval_rank"] = retrieval_rank
-            metadata["rerank_rank"] = rerank_rank
-            metadata["rerank_score"] = round(score, 4)
+        for rerank_rank, (retrieval_rank, score, doc) in enumerate(
+            scored_docs[:top_k], start=1
+        ):
+            metadata = doc.metadata if isinstance(doc.metadata, dict) else {}
             reranked.append(
-                Document(page_content=doc.page_content, metadata=metadata)
+                Document(
+                    page_content=doc.page_content,
+                    metadata={
+                        **metadata,
+                        "retrieval_rank": retrieval_rank,
+                        "rerank_rank": rerank_rank,
+                        "rerank_score": round(score, 4),
+                    },
+                )
             )
 
-        return reranked[:top_k]
+        return reranked
+
+
+if __name__ == "__main__":
+    # Build-time export: python -m app.rag.reranker <model_name> <cache_dir>
+    logging.basicConfig(level=logging.INFO)
+    print(export_onnx_model(sys.argv[1], sys.argv[2]))
@@ -8,17 +8,30 @@ the same model or cosine similarity is meaningless.
 Authentication: ChromaDB runs on Cloud Run with IAM-only access. We
 fetch a Google ID token and pass it as a Bearer token, same pattern as
 the ingestion Cloud Function (ingestion/main.py:38-58).
+
+Async callers (``ainvoke``) go through chromadb.AsyncHttpClient, with the
+sync Vertex AI embedding call pushed to a worker thread, so the event
+loop keeps serving other requests during the ChromaDB round-trip.
 """
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import functools
+import json
 import logging
 import subprocess
+import threading
 import time
 from pathlib import PurePath
 from typing import TYPE_CHECKING, Any
 
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 
@@ -30,118 +43,335 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 _EMBEDDING_MODEL = "text-embedding-004"
+_EMBEDDING_CACHE_SIZE = 1024
+
+_METADATA_IDENTITY_URL = (
+    "http://metadata.google.internal/computeMetadata/v1/"
+    "instance/service-accounts/default/identity"
+)
+_METADATA_TIMEOUT_SECONDS = 2
+_metadata_server_unavailable = False
+
+# Refresh this long before the token's own `exp` claim.
+_TOKEN_EXPIRY_MARGIN_SECONDS = 60
+# Used when the token isn't a decodable JWT (e.g. a gcloud access token).
+_DEFAULT_TOKEN_TTL_SECONDS = 50 * 60
+
+# audience_url -> (token, refresh_at_epoch). Container-wide so every
+# retriever instance (and any other Cloud Run caller) shares one token.
+_TOKEN_CACHE: dict[str, tuple[str, float]] = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_embedding_model(project: str, region: str) -> Any:
+    """Init Vertex AI and load the embedding model once per project/region."""
+    import vertexai
+    from vertexai.language_models import TextEmbeddingModel
+
+    vertexai.init(project=project, location=region)
+    return TextEmbeddingModel.from_pretrained(_EMBEDDING_MODEL)
+
+
+@functools.lru_cache(maxsize=_EMBEDDING_CACHE_SIZE)
+def _embed_text(project: str, region: str, query: str) -> np.ndarray:
+    """Embed one query, memoized so repeated questions skip the Vertex call.
+
+    Stored as a read-only float32 array: Chroma indexes float32 vectors,
+    so nothing is lost, and a cached 768-dim vector takes ~3KB instead of
+    ~25KB as a tuple of Python floats.
+    """
+    model = _load_embedding_model(project, region)
+    vector = np.asarray(model.get_embeddings([query])[0].values, dtype=np.float32)
+    vector.setflags(write=False)
+    return vector
+
+
+def clear_query_embedding_cache() -> None:
+    """Drop memoized query embeddings (e.g. between benchmark runs)."""
+    _embed_text.cache_clear()
+
+
+def _fetch_metadata_id_token(audience_url: str) -> str | None:
+    """Mint an ID token from the GCE/Cloud Run metadata server.
+
+    Returns None when the metadata server can't provide one. A refused or
+    unresolvable connection means there is no metadata server (local dev),
+    so that miss is remembered and later refreshes go straight to the
+    fallbacks. Timeouts and HTTP errors can happen on GCP too (e.g. during
+    a cold start), so those only skip the metadata server this once.
+    """
+    global _metadata_server_unavailable
+    if _metadata_server_unavailable:
+        return None
+
+    import requests
+
+    try:
+        resp = requests.get(
+            _METADATA_IDENTITY_URL,
+            params={"audience": audience_url},
+            headers={"Metadata-Flavor": "Google"},
+            timeout=_METADATA_TIMEOUT_SECONDS,
+        )
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        # ConnectTimeout is also a ConnectionError, but it's transient
+        if isinstance(exc, requests.ConnectionError) and not isinstance(
+            exc, requests.Timeout
+        ):
+            logger.info("Metadata server unavailable; using local credential fallbacks")
+            _metadata_server_unavailable = True
+        else:
+            logger.warning(
+                "Metadata server token request failed; using fallbacks this time",
+                exc_info=True,
+            )
+        return None
+    return resp.text.strip()
 
 
-class ChromaDBRetriever(BaseRetriever):
-    """Retrieves documents from ChromaDB using Vertex AI query embeddings."""
-
-    settings: Settings
-    _embedding_model: Any = None
-    _cached_auth_token: str | None = None
-    _cached_auth_expiry_epoch: float = 0.0
-
-    model_config = {"arbitrary_types_allowed": True}
-
-    def _get_auth_token(self, audience_url: str) -> str:
-        """Fetch and cache an auth token for ChromaDB Cloud Run IAM."""
-        now = time.time()
-        if self._cached_auth_token and now < self._cached_auth_expiry_epoch:
-            return self._cached_auth_token
-
-        import google.auth.transport.requests
-        import google.oauth2.id_token
+def _fetch_local_id_token(audience_url: str) -> str:
+    """Fetch a token via ADC, falling back to the gcloud CLI."""
+    import google.auth.transport.requests
+    import google.oauth2.id_token
 
-        auth_req = google.auth.transport.requests.Request()
-        token: str
+    auth_req = google.auth.transport.requests.Request()
+    token: str
 
+    try:
+        token = google.oauth2.id_token.fetch_id_token(auth_req, audience_url)
+    except Exception:
+        # Local dev/eval fallback when ADC is not configured. This keeps
+        # scripts usable with gcloud user auth without weakening Cloud Run IAM.
+        logger.warning("ADC token fetch failed; falling back to gcloud auth tokens")
         try:
-            token = google.oauth2.id_token.fetch_id_token(auth_req, audience_url)
-        except Exception:
-            # Local dev/eval fallback when ADC is not configured. This keeps
-            # scripts usable with gcloud user auth without weakening Cloud Run IAM.
-            logger.warning("ADC token fetch failed; falling back to gcloud auth tokens")
+            token = (
+                subprocess.check_output(
+                    [
+                        "gcloud",
+                        "auth",
+                        "print-identity-token",
+                        f"--audiences={audience_url}",
+                    ],
+                    text=True,
+                    stderr=subprocess.DEVNULL,
+                )
+                .strip()
+            )
+        except subprocess.CalledProcessError:
+            # User credentials often cannot set custom audiences.
+            # Retry without audience and finally with OAuth access token.
             try:
                 token = (
                     subprocess.check_output(
-                        [
-                            "gcloud",
-                            "auth",
-                            "print-identity-token",
-                            f"--audiences={audience_url}",
-                        ],
+                        ["gcloud", "auth", "print-identity-token"],
                         text=True,
                         stderr=subprocess.DEVNULL,
                     )
                     .strip()
                 )
             except subprocess.CalledProcessError:
-                # User credentials often cannot set custom audiences.
-                # Retry without audience and finally with OAuth access token.
-                try:
-                    token = (
-                        subprocess.check_output(
-                            ["gcloud", "auth", "print-identity-token"],
-                            text=True,
-                            stderr=subprocess.DEVNULL,
-                        )
-                        .strip()
-                    )
-                except subprocess.CalledProcessError:
-                    token = (
-                        subprocess.check_output(
-                            ["gcloud", "auth", "print-access-token"],
-                            text=True,
-                            stderr=subprocess.DEVNULL,
-                        )
-                        .strip()
+                token = (
+                    subprocess.check_output(
+                        ["gcloud", "auth", "print-access-token"],
+                        text=True,
+                        stderr=subprocess.DEVNULL,
                     )
+                    .strip()
+                )
+    return token
+
+
+def _token_expiry_epoch(token: str, now: float) -> float:
+    """Return when a cached token should be refreshed.
+
+    Reads the JWT `exp` claim without verifying the signature (the server
+    does that). Opaque or malformed tokens get the conservative default.
+    """
+    try:
+        payload_segment = token.split(".")[1]
+        payload_segment += "=" * (-len(payload_segment) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(payload_segment))
+        return float(payload["exp"]) - _TOKEN_EXPIRY_MARGIN_SECONDS
+    except (IndexError, KeyError, TypeError, ValueError):
+        return now + _DEFAULT_TOKEN_TTL_SECONDS
+
 
-        # Tokens are valid for about 1 hour; refresh conservatively.
-        self._cached_auth_token = token
-        self._cached_auth_expiry_epoch = now + (50 * 60)
+def _get_id_token(audience_url: str) -> str:
+    """Return a cached ID token for `audience_url`, fetching it if stale.
+
+    On Cloud Run the metadata server mints the ID token in one local
+    HTTP GET. Off GCP it falls back to ADC and then the gcloud CLI. The
+    lock is held across the fetch so concurrent first callers wait for
+    one token instead of each minting their own.
+    """
+    with _TOKEN_CACHE_LOCK:
+        now = time.time()
+        cached = _TOKEN_CACHE.get(audience_url)
+        if cached and now < cached[1]:
+            return cached[0]
+
+        token = _fetch_metadata_id_token(audience_url)
+        if token is None:
+            token = _fetch_local_id_token(audience_url)
+
+        _TOKEN_CACHE[audience_url] = (token, _token_expiry_epoch(token, now))
         return token
 
+
+def clear_token_cache() -> None:
+    """Forget all cached ID tokens (forces a refetch on next use)."""
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE.clear()
+
+
+def _build_metadata(
+    metadata: dict[str, Any] | None,
+    similarity: float,
+    distance: float,
+) -> dict[str, Any]:
+    """Copy a result's metadata and attach its (pre-rounded) scores."""
+    doc_metadata = dict(metadata) if metadata else {}
+    doc_metadata["similarity_score"] = similarity
+    doc_metadata["distance"] = distance
+
+    # Older ingestions only store `filename`; normalize to `source`
+    # so the UI and prompts can always show a meaningful label.
+    if not doc_metadata.get("source"):
+        filename = doc_metadata.get("filename")
+        if isinstance(filename, str) and filename:
+            doc_metadata["source"] = filename
+            doc_metadata["source_basename"] = PurePath(filename).name
+    return doc_metadata
+
+
+class ChromaDBRetriever(BaseRetriever):
+    """Retrieves documents from ChromaDB using Vertex AI query embeddings."""
+
+    settings: Settings
+    _cached_client: Any = None
+    _cached_collection: Any = None
+    _cached_client_token: str | None = None
+    _cached_async_client: Any = None
+    _cached_async_collection: Any = None
+    _cached_async_client_token: str | None = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_auth_token(self, audience_url: str) -> str:
+        """Fetch an auth token for ChromaDB Cloud Run IAM (shared cache)."""
+        return _get_id_token(audience_url)
+
+    def warm_up(self) -> None:
+        """Load the embedding model and mint an auth token ahead of traffic.
+
+        Called from the app lifespan so the first user query doesn't pay
+        for vertexai.init, the model fetch, or the token round-trip.
+        """
+        self._get_embedding_model()
+        self._get_auth_token(self.settings.chromadb_url)
+
+    def _client_kwargs(self, id_token: str) -> dict[str, Any]:
+        """Connection kwargs shared by the sync and async ChromaDB clients."""
+        return {
+            "host": self.settings.chromadb_host,
+            "port": self.settings.chromadb_port,
+            "ssl": self.settings.chromadb_ssl,
+            "headers": {"Authorization": f"Bearer {id_token}"},
+        }
+
     def _get_client(self) -> chromadb.HttpClient:
-        """Create an authenticated ChromaDB HTTP client.
+        """Return an authenticated ChromaDB HTTP client.
 
-        Auth tokens are cached in-process for ~50 minutes to keep repeated
-        retrieval calls fast while still refreshing well before expiry.
+        Auth tokens are cached in-process until a minute before their JWT
+        `exp` to keep repeated retrieval calls fast without mid-flight
+        401s. The client is reused for as long as its token is current; a
+        rotated token builds a fresh client and drops the cached collection.
         """
         import chromadb
-        url = self.settings.chromadb_url
-        host = url.replace("https://", "").replace("http://", "").rstrip("/")
-        ssl = url.startswith("https")
-        id_token = self._get_auth_token(url)
-
-        return chromadb.HttpClient(
-            host=host,
-            port=443 if ssl else 8000,
-            ssl=ssl,
-            headers={"Authorization": f"Bearer {id_token}"},
-        )
 
-    def _get_embedding_model(self) -> Any:
-        """Lazy-init the Vertex AI embedding model."""
-        if self._embedding_model is not None:
-            return self._embedding_model
+        id_token = self._get_auth_token(self.settings.chromadb_url)
+        if self._cached_client is None or self._cached_client_token != id_token:
+            self._cached_client = chromadb.HttpClient(**self._client_kwargs(id_token))
+            self._cached_client_token = id_token
+            self._cached_collection = None
+        return self._cached_client
 
-        import vertexai
-        from vertexai.language_models import TextEmbeddingModel
+    def _get_collection(self) -> Any:
+        """Return the cached collection handle for the current client.
 
-        vertexai.init(
-            project=self.settings.gcp_project,
-            location=self.settings.gcp_region,
+        get_collection is an HTTP round-trip, so it only runs when the
+        client is (re)built.
+        """
+        client = self._get_client()
+        if self._cached_collection is None:
+            self._cached_collection = client.get_collection(
+                name=self.settings.chromadb_collection,
+            )
+        return self._cached_collection
+
+    async def _aget_client(self) -> chromadb.AsyncClientAPI:
+        """Return an authenticated async ChromaDB HTTP client.
+
+        The retriever is an app-wide singleton (app.state.retriever), so
+        caching the client here gives every chat request one shared
+        connection pool instead of a fresh TLS handshake per retrieval.
+        Like the sync client, it's rebuilt when the token rotates.
+        """
+        import chromadb
+
+        # A token refresh may shell out or hit the network — keep it off the loop.
+        id_token = await asyncio.to_thread(
+            self._get_auth_token, self.settings.chromadb_url
         )
-        self._embedding_model = TextEmbeddingModel.from_pretrained(
-            _EMBEDDING_MODEL
+        if (
+            self._cached_async_client is None
+            or self._cached_async_client_token != id_token
+        ):
+            self._cached_async_client = await chromadb.AsyncHttpClient(
+                **self._client_kwargs(id_token)
+            )
+            self._cached_async_client_token = id_token
+            self._cached_async_collection = None
+        return self._cached_async_client
+
+    async def _aget_collection(self) -> Any:
+        """Async counterpart of _get_collection (cached per client)."""
+        client = await self._aget_client()
+        if self._cached_async_collection is None:
+            self._cached_async_collection = await client.get_collection(
+                name=self.settings.chromadb_collection,
+            )
+        return self._cached_async_collection
+
+    def _get_embedding_model(self) -> Any:
+        """Lazy-init the Vertex AI embedding model (shared per project/region)."""
+        return _load_embedding_model(
+            self.settings.gcp_project, self.settings.gcp_region
         )
-        return self._embedding_model
 
     def _embed_query(self, query: str) -> list[float]:
-        """Embed a single query string with text-embedding-004."""
-        model = self._get_embedding_model()
-        embeddings = model.get_embeddings([query])
-        return embeddings[0].values
+        """Embed a single query string with text-embedding-004 (LRU-cached)."""
+        return _embed_text(
+            self.settings.gcp_project, self.settings.gcp_region, query
+        ).tolist()
+
+    async def _aembed_query(self, query: str) -> list[float]:
+        """Embed a query without blocking the event loop.
+
+        The Vertex AI SDK has no async embedding call, so the sync one runs
+        in a worker thread.
+        """
+        return await asyncio.to_thread(self._embed_query, query)
+
+    async def aprefetch_embedding(self, query: str) -> None:
+        """Warm the query-embedding cache ahead of retrieval.
+
+        Lets callers overlap the Vertex AI round-trip with other work
+        (routing, response setup); the retrieval that follows is a cache hit.
+        """
+        await self._aembed_query(query)
 
     def _get_relevant_documents(
         self,
@@ -151,43 +381,55 @@ class ChromaDBRetriever(BaseRetriever):
     ) -> list[Document]:
         """Embed the query, search ChromaDB, return ranked Documents."""
         query_vector = self._embed_query(query)
-
-        client = self._get_client()
-        collection = client.get_collection(
-            name=self.settings.chromadb_collection,
-        )
+        collection = self._get_collection()
 
         results = collection.query(
             query_embeddings=[query_vector],
             n_results=self.settings.retrieval_candidate_k,
             include=["documents", "metadatas", "distances"],
         )
+        return self._to_documents(results)
 
-        documents: list[Document] = []
-        for doc_text, metadata, distance in zip(
-            results["documents"][0],
-            results["metadatas"][0],
-            results["distances"][0],
-        ):
-            # ChromaDB returns L2 distance by default; convert to a
-            # 0-1 similarity score (lower distance = higher similarity).
-            similarity = 1.0 / (1.0 + distance)
-
-            doc_metadata = dict(metadata) if metadata else {}
-            doc_metadata["similarity_score"] = round(similarity, 4)
-            doc_metadata["distance"] = round(distance, 4)
-
-            # Older ingestions only store `filename`; normalize to `source`
-            # so the UI and prompts can always show a meaningful label.
-            if not doc_metadata.get("source"):
-                filename = doc_metadata.get("filename")
-                if isinstance(filename, str) and filename:
-                    doc_metadata["source"] = filename
-                    doc_metadata["source_basename"] = PurePath(filename).name
-
-            documents.append(
-                Document(page_content=doc_text, metadata=doc_metadata)
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        """Async variant of _get_relevant_documents using AsyncHttpClient."""
+        query_vector = await self._aembed_query(query)
+        collection = await self._aget_collection()
+
+        results = await collection.query(
+            query_embeddings=[query_vector],
+            n_results=self.settings.retrieval_candidate_k,
+            include=["documents", "metadatas", "distances"],
+        )
+        return self._to_documents(results)
+
+    @staticmethod
+    def _to_documents(results: dict[str, Any]) -> list[Document]:
+        """Convert a ChromaDB query result into ranked Documents."""
+        # ChromaDB returns L2 distance by default; convert to a 0-1
+        # similarity score (lower distance = higher similarity) for the
+        # whole candidate set at once. tolist() hands back plain floats
+        # so the metadata stays JSON-serializable.
+        distances = np.asarray(results["distances"][0], dtype=np.float64)
+        similarities = np.round(1.0 / (1.0 + distances), 4).tolist()
+        rounded_distances = np.round(distances, 4).tolist()
+
+        documents = [
+            Document(
+                page_content=doc_text,
+                metadata=_build_metadata(metadata, similarity, distance),
+            )
+            for doc_text, metadata, similarity, distance in zip(
+                results["documents"][0],
+                results["metadatas"][0],
+                similarities,
+                rounded_distances,
             )
+        ]
 
         logger.info(
             "Retrieved %d documents for query (top score: %.4f)",
@@ -11,7 +11,7 @@ Each mode supports streaming (SSE) and non-streaming (JSON) responses.
 from __future__ import annotations
 
 import asyncio
-import json
+import contextlib
 import logging
 import time
 from typing import AsyncIterator
@@ -23,9 +23,9 @@ from pydantic import BaseModel
 
 from app.agent.router import classify_query
 from app.guardrails.input_validator import validate_query
-from app.observability.logger import log_query
+from app.observability.logger import log_query_background
 from app.rag.chain import RAGChain
-from app.utils import sse_event
+from app.utils import StreamEvent, sse_event
 
 logger = logging.getLogger(__name__)
 
@@ -46,13 +46,6 @@ class ChatResponse(BaseModel):
     query_mode: str = "rag"
 
 
-class ErrorResponse(BaseModel):
-    error: dict
-    query_mode: str
-    model: str
-    latency_ms: float
-
-
 def _error_response(
     *,
     query_mode: str,
@@ -60,15 +53,19 @@ def _error_response(
     latency_ms: float,
     message: str,
 ) -> JSONResponse:
-    """Build a structured HTTP 500 response for non-streaming failures."""
+    """Build a structured HTTP 500 response for non-streaming failures.
+
+    The body is a plain dict — every field is already the right type, so
+    a pydantic model round-trip would only add validation overhead.
+    """
     return JSONResponse(
         status_code=500,
-        content=ErrorResponse(
-            error={"type": "internal_error", "message": message},
-            query_mode=query_mode,
-            model=model_name,
-            latency_ms=round(latency_ms, 1),
-        ).model_dump(),
+        content={
+            "error": {"type": "internal_error", "message": message},
+            "query_mode": query_mode,
+            "model": model_name,
+            "latency_ms": round(latency_ms, 1),
+        },
     )
 
 
@@ -77,15 +74,16 @@ def _error_response(
 # ---------------------------------------------------------------------------
 
 async def _rag_logged_stream(
-    raw_stream: AsyncIterator[str],
+    raw_stream: AsyncIterator[StreamEvent],
     table_id: str,
     query: str,
     router_confidence: float | None = None,
-) -> AsyncIterator[str]:
-    """Wrap a raw SSE stream to capture done/error events and log the query.
+) -> AsyncIterator[bytes]:
+    """Forward the chain's SSE bytes and log the query when the stream ends.
 
-    Parses each SSE event as JSON to extract metadata. Tracks error events
-    emitted by the RAG chain so the log entry reflects the true status.
+    Reads done/error metadata straight from each StreamEvent's payload, so
+    nothing is re-parsed. Tracks error events emitted by the RAG chain so
+    the log entry reflects the true status.
     """
     model_used = ""
     latency_ms = 0.0
@@ -94,26 +92,17 @@ async def _rag_logged_stream(
     error_message = None
 
     async for event in raw_stream:
-        yield event
+        yield event.sse
 
-        line = event.removeprefix("data: ").strip()
-        if not line:
-            continue
-        try:
-            payload = json.loads(line)
-        except (json.JSONDecodeError, ValueError):
-            continue
-
-        event_type = payload.get("type")
-        if event_type == "error":
+        if event.type == "error":
             status = "error"
-            error_message = payload.get("message", "Unknown stream error")
-        elif event_type == "done":
-            model_used = payload.get("model", "")
-            latency_ms = payload.get("latency_ms", 0.0)
-            retrieval_count = payload.get("retrieval_count", 0)
+            error_message = event.payload.get("message", "Unknown stream error")
+        elif event.type == "done":
+            model_used = event.payload.get("model", "")
+            latency_ms = event.payload.get("latency_ms", 0.0)
+            retrieval_count = event.payload.get("retrieval_count", 0)
 
-    log_query(
+    log_query_background(
         table_id,
         query=query,
         model_used=model_used,
@@ -136,7 +125,7 @@ async def _agent_stream(
     table_id: str,
     query_mode: str,
     router_confidence: float | None = None,
-) -> AsyncIterator[str]:
+) -> AsyncIterator[bytes]:
     """Stream SSE events from the LangGraph agent.
 
     Event types:
@@ -148,6 +137,8 @@ async def _agent_stream(
     start = time.monotonic()
     status = "success"
     error_message = None
+    # Set once at each exit so the log records the latency the client saw.
+    latency_ms: float | None = None
 
     try:
         input_msg = {"messages": [HumanMessage(content=query)]}
@@ -202,12 +193,16 @@ async def _agent_stream(
         })
 
     finally:
-        log_query(
+        log_query_background(
             table_id,
             query=query,
             query_mode=query_mode,
             model_used=model_name,
-            latency_ms=(time.monotonic() - start) * 1000,
+            latency_ms=(
+                latency_ms
+                if latency_ms is not None
+                else (time.monotonic() - start) * 1000
+            ),
             status=status,
             error_message=error_message,
             router_confidence=router_confidence,
@@ -226,6 +221,8 @@ async def _agent_invoke(
     start = time.monotonic()
     status = "success"
     error_message = None
+    # Set once at each exit so the log records the latency the client saw.
+    latency_ms: float | None = None
 
     try:
         input_msg = {"messages": [HumanMessage(content=query)]}
@@ -264,12 +261,16 @@ async def _agent_invoke(
         )
 
     finally:
-        log_query(
+        log_query_background(
             table_id,
             query=query,
             query_mode=query_mode,
             model_used=model_name,
-            latency_ms=(time.monotonic() - start) * 1000,
+            latency_ms=(
+                latency_ms
+                if latency_ms is not None
+                else (time.monotonic() - start) * 1000
+            ),
             status=status,
             error_message=error_message,
             router_confidence=router_confidence,
@@ -280,6 +281,18 @@ async def _agent_invoke(
 # Endpoint
 # ---------------------------------------------------------------------------
 
+def _start_embedding_prefetch(retriever: object | None, query: str) -> asyncio.Task | None:
+    """Start embedding the query in the background, if a retriever is wired.
+
+    The embedding is the first network hop of the RAG path; starting it
+    as soon as the query is routed to RAG overlaps everything up to
+    retrieval.
+    """
+    if retriever is None:
+        return None
+    return asyncio.create_task(retriever.aprefetch_embedding(query))  # type: ignore[attr-defined]
+
+
 @router.post("/api/chat", response_model=None)
 async def chat(body: ChatRequest, request: Request) -> ChatResponse | StreamingResponse:
     settings = request.app.state.settings
@@ -290,23 +303,32 @@ async def chat(body: ChatRequest, request: Request) -> ChatResponse | StreamingR
     # Validate input
     query = validate_query(body.query, settings.max_query_length)
 
-    # Classify query
-    classification = classify_query(query)
-    query_mode = classification.mode
-
-    # If agent isn't available, fall back to RAG for everything
-    if agent is None and query_mode in ("metrics", "hybrid"):
+    # Without an agent every query goes to RAG, so skip classification
+    # entirely (router_confidence is logged as NULL for these).
+    router_confidence: float | None = None
+    if agent is None:
         query_mode = "rag"
+    else:
+        classification = classify_query(query)
+        query_mode = classification.mode
+        router_confidence = classification.confidence
 
     # --- RAG path (rag mode or fallback) ---
     if query_mode == "rag":
+        # Start the query embedding now so it overlaps response setup. Only
+        # RAG gets one: the agent writes its own search queries, and a
+        # to_thread embedding can't be stopped once started, so a prefetch
+        # begun before routing would still be billed for agent queries.
+        embedding_prefetch = _start_embedding_prefetch(
+            getattr(request.app.state, "retriever", None), query
+        )
         if body.stream:
             return StreamingResponse(
                 _rag_logged_stream(
-                    chain.stream(query),
+                    chain.stream(query, prefetch=embedding_prefetch),
                     settings.bigquery_query_log_table,
                     query,
-                    router_confidence=classification.confidence,
+                    router_confidence=router_confidence,
                 ),
                 media_type="text/event-stream",
                 headers={
@@ -320,15 +342,19 @@ async def chat(body: ChatRequest, request: Request) -> ChatResponse | StreamingR
         error_message = None
 
         try:
-            result = chain.invoke(query)
+            if embedding_prefetch is not None:
+                # A failed prefetch is retried (and reported) by the chain.
+                with contextlib.suppress(Exception):
+                    await embedding_prefetch
+            result = await chain.ainvoke(query)
 
-            log_query(
+            log_query_background(
                 settings.bigquery_query_log_table,
                 query=query,
                 model_used=result.model,
                 retrieval_count=result.retrieval_count,
                 latency_ms=result.latency_ms,
-                router_confidence=classification.confidence,
+                router_confidence=router_confidence,
             )
 
             return ChatResponse(
@@ -353,14 +379,14 @@ async def chat(body: ChatRequest, request: Request) -> ChatResponse | StreamingR
             error_message = "An internal error occurred while processing your query."
             latency_ms = (time.monotonic() - start) * 1000
 
-            log_query(
+            log_query_background(
                 settings.bigquery_query_log_table,
                 query=query,
                 model_used=model_name,
                 latency_ms=latency_ms,
                 status="error",
                 error_message=error_message,
-                router_confidence=classification.confidence,
+                router_confidence=router_confidence,
             )
 
             return _error_response(
@@ -379,7 +405,7 @@ async def chat(body: ChatRequest, request: Request) -> ChatResponse | StreamingR
                 model_name,
                 settings.bigquery_query_log_table,
                 query_mode,
-                router_confidence=classification.confidence,
+                router_confidence=router_confidence,
             ),
             media_type="text/event-stream",
             headers={
@@ -394,5 +420,5 @@ async def chat(body: ChatRequest, request: Request) -> ChatResponse | StreamingR
         model_name,
         query_mode,
         settings.bigquery_query_log_table,
-        router_confidence=classification.confidence,
+        router_confidence=router_confidence,
     )
@@ -3,18 +3,38 @@
 GET /api/dashboard/overview — Returns service health, uptime summary,
 resource utilization, query activity, and recent ingestions. Each section
 returns [] on individual query failure (partial success design).
+
+The five queries are independent, so they run concurrently in worker
+threads (the BigQuery client is sync); endpoint latency is the slowest
+query rather than the sum of all five.
+
+Responses are cached in-process for dashboard_cache_ttl_seconds, and
+concurrent misses share a single refresh, so a burst of dashboard opens
+costs one set of BigQuery scans. An overview with a failed section is
+served but not cached, and with the TTL at 0 requests load independently.
+
+Uptime summary and query activity read the daily rollup materialized views
+(uptime_daily, query_log_daily — see terraform/modules/bigquery), so they
+scan one row per service/day instead of a week of raw events. Their 7-day
+windows therefore start at a day boundary.
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import JSONResponse
 from google.cloud import bigquery
 from pydantic import BaseModel
 
+from app.utils import app_singleton, model_response
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -28,35 +48,162 @@ class DashboardOverviewResponse(BaseModel):
     recent_ingestions: list[dict[str, Any]]
 
 
-def _run_query(client: Any, sql: str) -> list[dict[str, Any]]:
-    """Execute a BigQuery query and return rows as dicts."""
-    rows = client.query(sql).result()
+# (project, observability dataset, metrics dataset) -> (cached_at, JSON body)
+_CACHE: dict[tuple[str, str, str], tuple[float, bytes]] = {}
+_CACHE_LOCK = asyncio.Lock()
+
+
+# Section SQL, formatted once per (project, obs dataset, metrics dataset)
+# by _dashboard_sql. Every per-request value is a query parameter.
+_SECTION_SQL: dict[str, str] = {
+    # Latest status per service (24h). ARRAY_AGG with LIMIT 1 keeps only
+    # the top row per group instead of sorting each partition the way
+    # ROW_NUMBER() does.
+    "service_health": """
+    SELECT service_name, latest.status, latest.response_time_ms, latest.checked_at
+    FROM (
+      SELECT service_name,
+             ARRAY_AGG(
+               STRUCT(status, response_time_ms, checked_at)
+               ORDER BY checked_at DESC LIMIT 1
+             )[OFFSET(0)] AS latest
+      FROM `{project}.{infra_ds}.uptime_events`
+      WHERE checked_at >= @since
+      GROUP BY service_name
+    )
+    ORDER BY service_name
+    """,
+    # Uptime summary (7d), from the uptime_daily rollup
+    "uptime_summary": """
+    SELECT service_name,
+           ROUND(SAFE_DIVIDE(SUM(up_checks), SUM(total_checks)) * 100, 2) AS uptime_percent,
+           SUM(total_checks) AS total_checks,
+           ROUND(SAFE_DIVIDE(SUM(response_ms_sum), SUM(response_ms_count)), 1) AS avg_response_ms
+    FROM `{project}.{infra_ds}.uptime_daily`
+    WHERE day >= @since
+    GROUP BY service_name
+    ORDER BY service_name
+    """,
+    # Latest utilization per node (24h), same idiom as service_health
+    "resource_utilization": """
+    SELECT node, latest.cpu_percent, latest.memory_percent,
+           latest.storage_percent, latest.collected_at
+    FROM (
+      SELECT node,
+             ARRAY_AGG(
+               STRUCT(cpu_percent, memory_percent, storage_percent, collected_at)
+               ORDER BY collected_at DESC LIMIT 1
+             )[OFFSET(0)] AS latest
+      FROM `{project}.{infra_ds}.resource_utilization`
+      WHERE collected_at >= @since
+      GROUP BY node
+    )
+    ORDER BY node
+    """,
+    # Daily query counts (7d), from the query_log_daily rollup
+    "query_activity": """
+    SELECT DATE(day) AS query_date,
+           total_queries,
+           successful,
+           failed,
+           ROUND(SAFE_DIVIDE(latency_ms_sum, latency_ms_count), 1) AS avg_latency_ms,
+           rag_queries,
+           metrics_queries,
+           hybrid_queries
+    FROM `{project}.{obs_ds}.query_log_daily`
+    WHERE day >= @since
+    ORDER BY query_date DESC
+    """,
+    # Last 10 ingestions
+    "recent_ingestions": """
+    SELECT file_name, file_type, status, chunk_count,
+           total_time_ms, timestamp
+    FROM `{project}.{obs_ds}.ingestion_log`
+    ORDER BY timestamp DESC
+    LIMIT 10
+    """,
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _dashboard_sql(project: str, obs_ds: str, infra_ds: str) -> dict[str, str]:
+    """Return the five section queries for the given datasets.
+
+    The datasets are fixed for the life of the process, so this formats
+    the SQL once and later requests reuse the same strings.
+    """
+    return {
+        name: sql.format(project=project, obs_ds=obs_ds, infra_ds=infra_ds)
+        for name, sql in _SECTION_SQL.items()
+    }
+
+
+def _cached_overview(key: tuple[str, str, str], ttl_seconds: float) -> bytes | None:
+    """Return the cached JSON body for key if it's younger than the TTL."""
+    entry = _CACHE.get(key)
+    if entry is not None and time.monotonic() - entry[0] < ttl_seconds:
+        return entry[1]
+    return None
+
+
+def _json_response(body: bytes) -> Response:
+    """Wrap an already-encoded JSON body."""
+    return Response(content=body, media_type="application/json")
+
+
+def _run_query(
+    client: Any, sql: str, job_config: Any = None
+) -> list[dict[str, Any]]:
+    """Execute a BigQuery query and return rows as dicts.
+
+    query_and_wait uses a single jobs.query call for short queries instead
+    of jobs.insert followed by jobs.get polling.
+    """
+    rows = client.query_and_wait(sql, job_config=job_config)
     return [dict(row) for row in rows]
 
 
-def _safe_query(client: Any, sql: str, label: str) -> list[dict[str, Any]]:
-    """Run a query, returning [] on failure (partial success)."""
+async def _safe_query(
+    client: Any, sql: str, label: str, job_config: Any = None
+) -> list[dict[str, Any]] | None:
+    """Run a query off the event loop, returning None on failure.
+
+    The caller shows a failed section as [] (partial success) but doesn't
+    cache it.
+    """
     try:
-        return _run_query(client, sql)
+        return await asyncio.to_thread(_run_query, client, sql, job_config)
     except Exception:
         logger.exception("Dashboard query failed: %s", label)
-        return []
+        return None
 
 
-@router.get("/api/dashboard/overview", response_model=None)
-async def dashboard_overview(
-    request: Request,
-) -> DashboardOverviewResponse | JSONResponse:
-    settings = request.app.state.settings
+def _window_config(since: datetime) -> Any:
+    """Job config binding a window's lower bound as the @since parameter.
 
-    if not settings.bigquery_observability_dataset or not settings.bigquery_metrics_dataset:
-        return JSONResponse(
-            status_code=503,
-            content={"detail": "Dashboard endpoint is not configured."},
-        )
+    A literal bound (rather than one derived from CURRENT_TIMESTAMP(),
+    which BigQuery treats as non-deterministic) keeps the query eligible
+    for the results cache and lets the planner prune to just the
+    partitions inside the window.
+    """
+    return bigquery.QueryJobConfig(
+        use_query_cache=True,
+        query_parameters=[
+            bigquery.ScalarQueryParameter("since", "TIMESTAMP", since),
+        ],
+    )
 
+
+async def _load_overview(
+    app_state: Any, project: str, obs_ds: str, infra_ds: str
+) -> tuple[DashboardOverviewResponse, bool] | JSONResponse:
+    """Run the five section queries and assemble the overview.
+
+    Also returns whether every section loaded; a partial overview is
+    served but not cached.
+    """
     try:
-        client = bigquery.Client()
+        client = app_singleton(app_state, "bq_client", bigquery.Client)
     except Exception:
         logger.exception("Failed to create BigQuery client")
         return JSONResponse(
@@ -64,89 +211,87 @@ async def dashboard_overview(
             content={"detail": "Failed to connect to BigQuery."},
         )
 
-    project = settings.gcp_project
-    obs_ds = settings.bigquery_observability_dataset
-    infra_ds = settings.bigquery_metrics_dataset
-
-    # 1. Service health: latest status per service (24h)
-    service_health = _safe_query(
-        client,
-        f"""
-        SELECT service_name, status, response_time_ms, checked_at
-        FROM `{project}.{infra_ds}.uptime_events`
-        WHERE checked_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 24 HOUR)
-        QUALIFY ROW_NUMBER() OVER (PARTITION BY service_name ORDER BY checked_at DESC) = 1
-        ORDER BY service_name
-        """,
-        "service_health",
-    )
-
-    # 2. Uptime summary (7d)
-    uptime_summary = _safe_query(
-        client,
-        f"""
-        SELECT service_name,
-               ROUND(SAFE_DIVIDE(COUNTIF(status = 'up'), COUNT(*)) * 100, 2) AS uptime_percent,
-               COUNT(*) AS total_checks,
-               ROUND(AVG(response_time_ms), 1) AS avg_response_ms
-        FROM `{project}.{infra_ds}.uptime_events`
-        WHERE checked_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
-        GROUP BY service_name
-        ORDER BY service_name
-        """,
-        "uptime_summary",
-    )
-
-    # 3. Resource utilization: latest per node (24h)
-    resource_utilization = _safe_query(
-        client,
-        f"""
-        SELECT node, cpu_percent, memory_percent, storage_percent, collected_at
-        FROM `{project}.{infra_ds}.resource_utilization`
-        WHERE collected_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 24 HOUR)
-        QUALIFY ROW_NUMBER() OVER (PARTITION BY node ORDER BY collected_at DESC) = 1
-        ORDER BY node
-        """,
-        "resource_utilization",
+    # Bounds are computed from now truncated to the minute, so repeat loads
+    # within the same minute send identical SQL + parameters.
+    as_of = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    last_24h = _window_config(since=as_of - timedelta(hours=24))
+    last_7d_days = _window_config(
+        since=(as_of - timedelta(days=7)).replace(hour=0, minute=0)
     )
 
-    # 4. Query activity: daily counts (7d)
-    query_activity = _safe_query(
-        client,
-        f"""
-        SELECT DATE(timestamp) AS query_date,
-               COUNT(*) AS total_queries,
-               COUNTIF(status = 'success') AS successful,
-               COUNTIF(status != 'success') AS failed,
-               ROUND(AVG(latency_ms), 1) AS avg_latency_ms,
-               COUNTIF(query_mode = 'rag') AS rag_queries,
-               COUNTIF(query_mode = 'metrics') AS metrics_queries,
-               COUNTIF(query_mode = 'hybrid') AS hybrid_queries
-        FROM `{project}.{obs_ds}.query_log`
-        WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
-        GROUP BY query_date
-        ORDER BY query_date DESC
-        """,
-        "query_activity",
+    sql = _dashboard_sql(project, obs_ds, infra_ds)
+    sections = await asyncio.gather(
+        _safe_query(client, sql["service_health"], "service_health", last_24h),
+        _safe_query(client, sql["uptime_summary"], "uptime_summary", last_7d_days),
+        _safe_query(
+            client, sql["resource_utilization"], "resource_utilization", last_24h
+        ),
+        _safe_query(client, sql["query_activity"], "query_activity", last_7d_days),
+        _safe_query(client, sql["recent_ingestions"], "recent_ingestions"),
     )
 
-    # 5. Recent ingestions (last 10)
-    recent_ingestions = _safe_query(
-        client,
-        f"""
-        SELECT file_name, file_type, status, chunk_count,
-               total_time_ms, timestamp
-        FROM `{project}.{obs_ds}.ingestion_log`
-        ORDER BY timestamp DESC
-        LIMIT 10
-        """,
-        "recent_ingestions",
-    )
-
-    return DashboardOverviewResponse(
+    (
+        service_health,
+        uptime_summary,
+        resource_utilization,
+        query_activity,
+        recent_ingestions,
+    ) = (rows or [] for rows in sections)
+    response = DashboardOverviewResponse(
         service_health=service_health,
         uptime_summary=uptime_summary,
         resource_utilization=resource_utilization,
         query_activity=query_activity,
         recent_ingestions=recent_ingestions,
     )
+    return response, all(rows is not None for rows in sections)
+
+
+@router.get("/api/dashboard/overview", response_model=None)
+async def dashboard_overview(request: Request) -> Response:
+    """Return the overview as JSON, encoded once per refresh.
+
+    Cache hits reuse the encoded bytes instead of re-rendering the model.
+    """
+    settings = request.app.state.settings
+
+    if not settings.bigquery_observability_dataset or not settings.bigquery_metrics_dataset:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Dashboard endpoint is not configured."},
+        )
+
+    project = settings.gcp_project
+    obs_ds = settings.bigquery_observability_dataset
+    infra_ds = settings.bigquery_metrics_dataset
+    cache_key = (project, obs_ds, infra_ds)
+    ttl = settings.dashboard_cache_ttl_seconds
+
+    if ttl <= 0:
+        # Caching is off, so there's nothing to share: load concurrently
+        loaded = await _load_overview(request.app.state, project, obs_ds, infra_ds)
+        if isinstance(loaded, JSONResponse):
+            return loaded
+        return model_response(loaded[0])
+
+    cached = _cached_overview(cache_key, ttl)
+    if cached is not None:
+        return _json_response(cached)
+
+    # Single-flight: whoever takes the lock first refreshes; everyone who
+    # was waiting on it then finds the fresh entry on the re-check.
+    async with _CACHE_LOCK:
+        cached = _cached_overview(cache_key, ttl)
+        if cached is not None:
+            return _json_response(cached)
+
+        loaded = await _load_overview(request.app.state, project, obs_ds, infra_ds)
+        if isinstance(loaded, JSONResponse):
+            return loaded
+
+        response, complete = loaded
+        rendered = model_response(response)
+        # A section that failed would otherwise stay blank for the whole TTL
+        if complete:
+            _CACHE[cache_key] = (time.monotonic(), bytes(rendered.body))
+        return rendered
@@ -3,26 +3,62 @@
 POST /api/upload         — Upload a file to GCS (triggers Cloud Function ingestion)
 GET  /api/upload/status  — Check ingestion status for a specific file
 GET  /api/upload/recent  — List the 20 most recent ingestion events
+GET  /api/upload/overview — Recent events plus one file's status, in one query
+POST /internal/upload/notify — Completion notice from the ingestion function
+
+Status responses are cached in-process per file name (briefly while the
+file is still processing, longer for errors, and indefinitely once
+ingestion has succeeded), so a burst of client polls costs one BigQuery
+query.
+
+The ingestion function also POSTs each final status to
+/internal/upload/notify. That fills the same cache and wakes any poll
+waiting on the file. A poll only waits once it knows the file is still
+processing (from the cache or BigQuery), so a finished file is answered
+straight away; a waiting poll returns as soon as its notice arrives. The
+notice only reaches one instance; polls that land on another instance
+time out of their wait and read BigQuery again.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
 import logging
 import re
+import time
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Any
 
-from fastapi import APIRouter, Request, UploadFile
+from fastapi import APIRouter, Request, Response, UploadFile
 from fastapi.responses import JSONResponse
+from google.auth import jwt
 from google.cloud import bigquery, storage
 from pydantic import BaseModel
 
+from app.utils import app_singleton, file_too_large_detail, model_response
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Characters allowed in sanitized filenames
-_SAFE_FILENAME_RE = re.compile(r"[^a-z0-9._-]")
+# Runs of characters outside the safe set (a-z 0-9 . -). Underscores are
+# included in the run so "a _ b" and "a__b" both collapse to a single "_".
+_UNSAFE_FILENAME_RUN_RE = re.compile(r"[^a-z0-9.-]+")
+
+# Read size when measuring an upload that didn't report its own size
+_READ_CHUNK_BYTES = 1 << 20
+
+# Object names from upload_file carry their upload date (UTC), and a file
+# can't be ingested before it's uploaded, so a status lookup can start at
+# that day and BigQuery prunes the older ingestion_log partitions.
+_UPLOAD_DATE_RE = re.compile(r"uploads/(\d{4})/(\d{2})/(\d{2})/")
+# @since for names without an upload date: no lower bound
+_NO_LOWER_BOUND = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 class UploadResponse(BaseModel):
@@ -48,17 +84,333 @@ class RecentUploadsResponse(BaseModel):
     files: list[UploadStatusResponse]
 
 
+class UploadOverviewResponse(BaseModel):
+    status: UploadStatusResponse | None = None
+    files: list[UploadStatusResponse]
+
+
+# Status polls are answered from memory. "processing" can flip at any
+# moment, so it's only held briefly. "error" ends a poll but isn't final:
+# the ingestion function re-raises so Cloud Functions retries, and a retry
+# can still log success. "success" never changes (object names are unique
+# per upload), so those are kept with no TTL in a bounded LRU.
+_STATUS_PENDING_TTL_SECONDS = 3.0
+_STATUS_TERMINAL_TTL_SECONDS = 60.0
+_STATUS_TERMINAL = frozenset({"success", "error"})
+_STATUS_CACHE_MAX_ENTRIES = 1024
+_SUCCESS_CACHE_MAX_ENTRIES = 10_000
+
+# (project, dataset, file_name) -> (expires_at, response)
+_STATUS_CACHE: dict[tuple[str, str, str], tuple[float, UploadStatusResponse]] = {}
+# (project, dataset, file_name) -> response, least recently used first
+_SUCCESS_CACHE: OrderedDict[tuple[str, str, str], UploadStatusResponse] = OrderedDict()
+
+
+
+@dataclass(slots=True)
+class _Waiters:
+    """Polls waiting on one file's completion notice."""
+
+    event: asyncio.Event = field(default_factory=asyncio.Event)
+    count: int = 0
+
+
+# Polls waiting on a completion notice, keyed like _STATUS_CACHE. Bounded
+# by _STATUS_CACHE_MAX_ENTRIES; past that, polls skip waiting.
+_STATUS_WAITERS: dict[tuple[str, str, str], _Waiters] = {}
+
+# Shared by the status and recent reads; they differ only in WHERE/LIMIT.
+_INGESTION_SELECT = """
+    SELECT file_name, file_type, status, chunk_count, chunks_sanitized,
+           total_time_ms, error_message, timestamp
+    FROM `{project}.{dataset}.ingestion_log`
+"""
+
+# Default and upper bound for the overview's recent list
+_RECENT_LIMIT = 20
+
+# Both ingestion_log reads as one job, each row tagged with the branch it
+# came from. A NULL @file_name matches nothing, so the status branch is
+# empty when no file is asked for and the SQL stays the same either way.
+# As in the standalone reads, only the status branch is bounded by @since.
+_OVERVIEW_SQL = """
+    (SELECT 'status' AS kind, file_name, file_type, status, chunk_count,
+            chunks_sanitized, total_time_ms, error_message, timestamp
+     FROM `{project}.{dataset}.ingestion_log`
+     WHERE file_name = @file_name AND timestamp >= @since
+     ORDER BY timestamp DESC
+     LIMIT 1)
+    UNION ALL
+    (SELECT 'recent' AS kind, file_name, file_type, status, chunk_count,
+            chunks_sanitized, total_time_ms, error_message, timestamp
+     FROM `{project}.{dataset}.ingestion_log`
+     ORDER BY timestamp DESC
+     LIMIT @limit)
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def _ingestion_queries(project: str, dataset: str) -> tuple[str, str]:
+    """Return the (status, recent) SQL for an observability dataset.
+
+    Built once per dataset. Both are fully parameterized, so repeat reads
+    send byte-identical SQL and can be answered from BigQuery's cache.
+    """
+    select = _INGESTION_SELECT.format(project=project, dataset=dataset)
+    status_sql = select + """
+    WHERE file_name = @file_name AND timestamp >= @since
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+    recent_sql = select + """
+    ORDER BY timestamp DESC
+    LIMIT 20
+"""
+    return status_sql, recent_sql
+
+
+@functools.lru_cache(maxsize=8)
+def _overview_query(project: str, dataset: str) -> str:
+    """Return the combined status + recent SQL for an observability dataset."""
+    return _OVERVIEW_SQL.format(project=project, dataset=dataset)
+
+
+def _uploaded_since(file_name: str | None) -> datetime:
+    """Earliest timestamp an ingestion_log row for file_name can have.
+
+    The start of the UTC day in the object name's uploads/YYYY/MM/DD/
+    prefix, or no bound for names that don't carry one.
+    """
+    match = _UPLOAD_DATE_RE.match(file_name or "")
+    if match is None:
+        return _NO_LOWER_BOUND
+    try:
+        return datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+    except ValueError:
+        return _NO_LOWER_BOUND
+
+
+def _ingestion_job_config(
+    *params: bigquery.ScalarQueryParameter,
+) -> bigquery.QueryJobConfig:
+    """Job config for an ingestion_log read with the given parameters."""
+    return bigquery.QueryJobConfig(
+        use_query_cache=True, query_parameters=list(params)
+    )
+
+
+def _status_params(file_name: str | None) -> list[bigquery.ScalarQueryParameter]:
+    """@file_name and its @since bound, for a status lookup."""
+    return [
+        bigquery.ScalarQueryParameter("file_name", "STRING", file_name),
+        bigquery.ScalarQueryParameter(
+            "since", "TIMESTAMP", _uploaded_since(file_name)
+        ),
+    ]
+
+
+def _cached_status(key: tuple[str, str, str]) -> UploadStatusResponse | None:
+    """Return the cached status for key if it hasn't expired."""
+    success = _SUCCESS_CACHE.get(key)
+    if success is not None:
+        _SUCCESS_CACHE.move_to_end(key)
+        return success
+    entry = _STATUS_CACHE.get(key)
+    if entry is not None and time.monotonic() < entry[0]:
+        return entry[1]
+    return None
+
+
+def _cache_status(
+    key: tuple[str, str, str],
+    response: UploadStatusResponse,
+    *,
+    confirmed: bool = True,
+) -> None:
+    """Cache a status response: success indefinitely, others with a TTL.
+
+    Unconfirmed statuses (pushed notices rather than BigQuery rows) always
+    get a TTL, so a bad notice can't pin a file's status for the life of
+    the process.
+    """
+    if response.status == "success" and confirmed:
+        _STATUS_CACHE.pop(key, None)
+        _SUCCESS_CACHE[key] = response
+        _SUCCESS_CACHE.move_to_end(key)
+        if len(_SUCCESS_CACHE) > _SUCCESS_CACHE_MAX_ENTRIES:
+            _SUCCESS_CACHE.popitem(last=False)
+        return
+
+    now = time.monotonic()
+    if len(_STATUS_CACHE) >= _STATUS_CACHE_MAX_ENTRIES:
+        for stale in [k for k, (exp, _) in _STATUS_CACHE.items() if exp <= now]:
+            del _STATUS_CACHE[stale]
+        if len(_STATUS_CACHE) >= _STATUS_CACHE_MAX_ENTRIES:
+            # Still full of live entries: drop the oldest insertion
+            del _STATUS_CACHE[next(iter(_STATUS_CACHE))]
+    ttl = (
+        _STATUS_TERMINAL_TTL_SECONDS
+        if response.status in _STATUS_TERMINAL
+        else _STATUS_PENDING_TTL_SECONDS
+    )
+    _STATUS_CACHE[key] = (now + ttl, response)
+
+
+def _query_rows(client: Any, sql: str, job_config: Any) -> list[dict[str, Any]]:
+    """Run a query and fetch every row as a dict.
+
+    The BigQuery client is sync and pages lazily while iterating, so
+    callers run this whole function in a worker thread.
+    """
+    return [dict(row) for row in client.query_and_wait(sql, job_config=job_config)]
+
+
+async def _wait_for_notify(
+    key: tuple[str, str, str], timeout: float
+) -> UploadStatusResponse | None:
+    """Wait up to timeout for a completion notice; return the final status.
+
+    The last poll to stop waiting removes the entry if no notice came,
+    since the notice may have gone to another instance and otherwise the
+    entry would never be cleared. Polls still waiting keep it registered.
+    """
+    waiters = _STATUS_WAITERS.get(key)
+    if waiters is None:
+        if len(_STATUS_WAITERS) >= _STATUS_CACHE_MAX_ENTRIES:
+            return None
+        waiters = _STATUS_WAITERS[key] = _Waiters()
+    waiters.count += 1
+    try:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(waiters.event.wait(), timeout)
+    finally:
+        waiters.count -= 1
+        if not waiters.count and _STATUS_WAITERS.get(key) is waiters:
+            del _STATUS_WAITERS[key]
+    cached = _cached_status(key)
+    if cached is not None and cached.status in _STATUS_TERMINAL:
+        return cached
+    return None
+
+
+def _wake_waiters(key: tuple[str, str, str]) -> None:
+    """Wake every poll waiting on key's completion notice."""
+    waiters = _STATUS_WAITERS.pop(key, None)
+    if waiters is not None:
+        waiters.event.set()
+
+
+async def _read_status(
+    request: Request, key: tuple[str, str, str], file_name: str
+) -> UploadStatusResponse:
+    """Read a file's latest status from BigQuery and cache it."""
+    settings = request.app.state.settings
+    client = app_singleton(request.app.state, "bq_client", bigquery.Client)
+    status_sql, _ = _ingestion_queries(
+        settings.gcp_project, settings.bigquery_observability_dataset
+    )
+    job_config = _ingestion_job_config(*_status_params(file_name))
+    rows = await asyncio.to_thread(_query_rows, client, status_sql, job_config)
+
+    if rows:
+        response = _status_from_row(rows[0])
+    else:
+        response = UploadStatusResponse(file_name=file_name, status="processing")
+    _cache_status(key, response)
+    return response
+
+
+def _notify_caller(request: Request) -> str | None:
+    """Return the email claim of the caller's ID token, if there is one.
+
+    Cloud Run IAM has already checked the token's signature and audience
+    before the request reaches the container, so only the claims are read
+    here.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        claims = jwt.decode(token, verify=False)
+    except Exception:
+        return None
+    return claims.get("email")
+
+
+def _status_from_row(row: dict[str, Any]) -> UploadStatusResponse:
+    """Build an UploadStatusResponse from an ingestion_log row.
+
+    The row comes from a typed BigQuery schema whose columns match the
+    model's fields, so pydantic validation is skipped.
+    """
+    timestamp = row.get("timestamp")
+    return UploadStatusResponse.model_construct(
+        **{
+            **row,
+            "status": row.get("status") or "success",
+            "timestamp": timestamp.isoformat() if timestamp else None,
+        }
+    )
+
+
+def _fetch_upload_state(
+    client: Any, project: str, dataset: str, file_name: str | None, limit: int
+) -> tuple[UploadStatusResponse | None, list[UploadStatusResponse]]:
+    """Read one file's latest status and the recent events in a single job.
+
+    Returns (status, recent). status is None when no file_name is given,
+    and "processing" when the file has no ingestion_log row yet. Like
+    _query_rows, this is sync and meant for a worker thread.
+    """
+    job_config = _ingestion_job_config(
+        *_status_params(file_name),
+        bigquery.ScalarQueryParameter("limit", "INT64", limit),
+    )
+    status: UploadStatusResponse | None = None
+    recent: list[UploadStatusResponse] = []
+    sql = _overview_query(project, dataset)
+    for row in client.query_and_wait(sql, job_config=job_config):
+        fields = dict(row)
+        if fields.pop("kind") == "status":
+            status = _status_from_row(fields)
+        else:
+            recent.append(_status_from_row(fields))
+
+    # UNION ALL doesn't keep the branches' order; restore newest first.
+    recent.sort(key=lambda r: r.timestamp or "", reverse=True)
+    if status is None and file_name is not None:
+        status = UploadStatusResponse(file_name=file_name, status="processing")
+    return status, recent
+
+
 def _sanitize_filename(name: str) -> str:
     """Sanitize a filename: strip path components, lowercase, remove unsafe chars."""
     # Take only the final path component (prevents path traversal)
-    name = name.rsplit("/", 1)[-1].rsplit("\\", 1)[-1]
-    name = name.lower().strip()
-    name = _SAFE_FILENAME_RE.sub("_", name)
-    # Collapse consecutive underscores
-    name = re.sub(r"_+", "_", name).strip("_")
+    name = name.replace("\\", "/").rsplit("/", 1)[-1].lower().strip()
+    # One pass: replace and collapse unsafe runs together
+    name = _UNSAFE_FILENAME_RUN_RE.sub("_", name).strip("_")
     return name or "unnamed"
 
 
+async def _upload_size(file: UploadFile, limit: int) -> int | None:
+    """Return the upload's size in bytes, or None once it exceeds limit.
+
+    Starlette records the size while spooling the multipart body; when it
+    hasn't, count in bounded chunks rather than reading the whole file
+    into memory. Leaves the file rewound for the GCS upload.
+    """
+    if file.size is not None:
+        return file.size if file.size <= limit else None
+
+    size = 0
+    while chunk := await file.read(_READ_CHUNK_BYTES):
+        size += len(chunk)
+        if size > limit:
+            return None
+    await file.seek(0)
+    return size
+
+
 def _get_extension(filename: str) -> str:
     """Extract file extension (without dot), lowercased.
 
@@ -66,15 +418,14 @@ def _get_extension(filename: str) -> str:
     basename so it can be matched against the allowlist.
     """
     # Strip path components first
-    name = filename.rsplit("/", 1)[-1].rsplit("\\", 1)[-1]
-    if "." in name:
-        return name.rsplit(".", 1)[-1].lower()
-    # Dotless filename — return the whole name lowered (e.g. "dockerfile")
-    return name.lower()
+    name = filename.rpartition("/")[2].rpartition("\\")[2]
+    # Dotless filename — the whole name lowered (e.g. "dockerfile")
+    _, dot, ext = name.rpartition(".")
+    return (ext if dot else name).lower()
 
 
 @router.post("/api/upload", response_model=None)
-async def upload_file(request: Request, file: UploadFile) -> UploadResponse | JSONResponse:
+async def upload_file(request: Request, file: UploadFile) -> Response:
     settings = request.app.state.settings
 
     if not settings.gcs_uploads_bucket:
@@ -93,13 +444,12 @@ async def upload_file(request: Request, file: UploadFile) -> UploadResponse | JS
             content={"detail": f"File type '.{ext}' is not supported."},
         )
 
-    # Read file content and validate size
-    content = await file.read()
-    if len(content) > settings.max_upload_size_bytes:
-        max_mb = settings.max_upload_size_bytes / (1024 * 1024)
+    # Validate size without buffering the file in memory
+    size_bytes = await _upload_size(file, settings.max_upload_size_bytes)
+    if size_bytes is None:
         return JSONResponse(
-            status_code=400,
-            content={"detail": f"File exceeds maximum size of {max_mb:.0f} MB."},
+            status_code=413,
+            content={"detail": file_too_large_detail(settings.max_upload_size_bytes)},
         )
 
     # Generate unique object key
@@ -108,13 +458,16 @@ async def upload_file(request: Request, file: UploadFile) -> UploadResponse | JS
     short_uuid = uuid.uuid4().hex[:8]
     object_name = f"uploads/{now:%Y/%m/%d}/{short_uuid}-{safe_name}"
 
-    # Upload to GCS
+    # Stream the spooled upload to GCS; the SDK call is sync, so keep it
+    # off the event loop.
     try:
-        client = storage.Client()
+        client = app_singleton(request.app.state, "gcs_client", storage.Client)
         bucket = client.bucket(settings.gcs_uploads_bucket)
         blob = bucket.blob(object_name)
         blob.metadata = {"x-goog-meta-original-name": original_name}
-        blob.upload_from_string(content)
+        await asyncio.to_thread(
+            blob.upload_from_file, file.file, size=size_bytes, rewind=True
+        )
     except Exception:
         logger.exception("Failed to upload file to GCS")
         return JSONResponse(
@@ -122,18 +475,20 @@ async def upload_file(request: Request, file: UploadFile) -> UploadResponse | JS
             content={"detail": "Failed to upload file. Please try again."},
         )
 
-    return UploadResponse(
-        file_name=original_name,
-        object_name=object_name,
-        bucket=settings.gcs_uploads_bucket,
-        size_bytes=len(content),
+    return model_response(
+        UploadResponse(
+            file_name=original_name,
+            object_name=object_name,
+            bucket=settings.gcs_uploads_bucket,
+            size_bytes=size_bytes,
+        )
     )
 
 
 @router.get("/api/upload/status", response_model=None)
 async def upload_status(
     request: Request, file_name: str
-) -> UploadStatusResponse | JSONResponse:
+) -> Response:
     settings = request.app.state.settings
 
     if not settings.bigquery_observability_dataset:
@@ -142,37 +497,22 @@ async def upload_status(
             content={"detail": "Upload status endpoint is not configured."},
         )
 
+    cache_key = (
+        settings.gcp_project, settings.bigquery_observability_dataset, file_name
+    )
+    wait = settings.upload_status_wait_seconds
     try:
-        client = bigquery.Client()
-        query = f"""
-            SELECT file_name, file_type, status, chunk_count, chunks_sanitized,
-                   total_time_ms, error_message, timestamp
-            FROM `{settings.gcp_project}.{settings.bigquery_observability_dataset}.ingestion_log`
-            WHERE file_name = @file_name
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("file_name", "STRING", file_name),
-            ]
-        )
-        rows = list(client.query(query, job_config=job_config).result())
-
-        if not rows:
-            return UploadStatusResponse(file_name=file_name, status="processing")
-
-        row = rows[0]
-        return UploadStatusResponse(
-            file_name=row.file_name,
-            file_type=row.file_type,
-            status=row.status or "success",
-            chunk_count=row.chunk_count,
-            chunks_sanitized=row.chunks_sanitized,
-            total_time_ms=row.total_time_ms,
-            error_message=row.error_message,
-            timestamp=row.timestamp.isoformat() if row.timestamp else None,
-        )
+        response = _cached_status(cache_key)
+        if response is None:
+            response = await _read_status(request, cache_key, file_name)
+        # Only a file known to be processing waits for its notice; if none
+        # comes (it may have gone to another instance), read BigQuery again.
+        if response.status == "processing" and wait > 0:
+            notified = await _wait_for_notify(cache_key, wait)
+            if notified is not None:
+                return model_response(notified)
+            response = await _read_status(request, cache_key, file_name)
+        return model_response(response)
 
     except Exception:
         logger.exception("Failed to query ingestion status")
@@ -182,8 +522,42 @@ async def upload_status(
         )
 
 
+@router.post("/internal/upload/notify", response_model=None)
+async def upload_notify(
+    request: Request, body: UploadStatusResponse
+) -> Response:
+    """Record a status pushed by the ingestion function and wake its pollers.
+
+    Not routed through the API gateway. Cloud Run IAM admits every
+    run.invoker (the frontend's service account too), so the caller must
+    also be upload_notify_sa_email. Notices are cached with a TTL only;
+    a success becomes permanent once BigQuery confirms it.
+    """
+    settings = request.app.state.settings
+
+    if not settings.bigquery_observability_dataset:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Upload status endpoint is not configured."},
+        )
+
+    allowed = settings.upload_notify_sa_email
+    if not allowed or _notify_caller(request) != allowed:
+        return JSONResponse(
+            status_code=403,
+            content={"detail": "Caller may not post upload status."},
+        )
+
+    cache_key = (
+        settings.gcp_project, settings.bigquery_observability_dataset, body.file_name
+    )
+    _cache_status(cache_key, body, confirmed=False)
+    _wake_waiters(cache_key)
+    return Response(status_code=204)
+
+
 @router.get("/api/upload/recent", response_model=None)
-async def upload_recent(request: Request) -> RecentUploadsResponse | JSONResponse:
+async def upload_recent(request: Request) -> Response:
     settings = request.app.state.settings
 
     if not settings.bigquery_observability_dataset:
@@ -193,31 +567,16 @@ async def upload_recent(request: Request) -> RecentUploadsResponse | JSONRespons
         )
 
     try:
-        client = bigquery.Client()
-        query = f"""
-            SELECT file_name, file_type, status, chunk_count, chunks_sanitized,
-                   total_time_ms, error_message, timestamp
-            FROM `{settings.gcp_project}.{settings.bigquery_observability_dataset}.ingestion_log`
-            ORDER BY timestamp DESC
-            LIMIT 20
-        """
-        rows = list(client.query(query).result())
-
-        files = [
-            UploadStatusResponse(
-                file_name=row.file_name,
-                file_type=row.file_type,
-                status=row.status or "success",
-                chunk_count=row.chunk_count,
-                chunks_sanitized=row.chunks_sanitized,
-                total_time_ms=row.total_time_ms,
-                error_message=row.error_message,
-                timestamp=row.timestamp.isoformat() if row.timestamp else None,
-            )
-            for row in rows
-        ]
-
-        return RecentUploadsResponse(files=files)
+        client = app_singleton(request.app.state, "bq_client", bigquery.Client)
+        _, recent_sql = _ingestion_queries(
+            settings.gcp_project, settings.bigquery_observability_dataset
+        )
+        rows = await asyncio.to_thread(
+            _query_rows, client, recent_sql, _ingestion_job_config()
+        )
+        files = [_status_from_row(row) for row in rows]
+
+        return model_response(RecentUploadsResponse(files=files))
 
     except Exception:
         logger.exception("Failed to query recent ingestions")
@@ -225,3 +584,46 @@ async def upload_recent(request: Request) -> RecentUploadsResponse | JSONRespons
             status_code=500,
             content={"detail": "Failed to retrieve recent uploads."},
         )
+
+
+@router.get("/api/upload/overview", response_model=None)
+async def upload_overview(
+    request: Request, file_name: str | None = None, limit: int = _RECENT_LIMIT
+) -> Response:
+    """Return the recent list and, optionally, one file's status.
+
+    For views that show both: one BigQuery job instead of a status read
+    and a recent read. The status it reads also fills the status cache.
+    """
+    settings = request.app.state.settings
+
+    if not settings.bigquery_observability_dataset:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Upload overview endpoint is not configured."},
+        )
+
+    limit = max(1, min(limit, _RECENT_LIMIT))
+    try:
+        client = app_singleton(request.app.state, "bq_client", bigquery.Client)
+        status, files = await asyncio.to_thread(
+            _fetch_upload_state,
+            client,
+            settings.gcp_project,
+            settings.bigquery_observability_dataset,
+            file_name,
+            limit,
+        )
+    except Exception:
+        logger.exception("Failed to query upload overview")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": "Failed to retrieve upload overview."},
+        )
+
+    if file_name is not None and status is not None:
+        _cache_status(
+            (settings.gcp_project, settings.bigquery_observability_dataset, file_name),
+            status,
+        )
+    return model_response(UploadOverviewResponse(status=status, files=files))
@@ -1,8 +1,68 @@
 """Shared utilities for the RAG service."""
 
-import json
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
 
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 
-def sse_event(data: dict) -> str:
-    """Format a dict as an SSE data line."""
-    return f"data: {json.dumps(data)}\n\n"
+T = TypeVar("T")
+
+
+def sse_event(data: dict) -> bytes:
+    """Format a dict as an SSE data line.
+
+    orjson encodes in compact form (no spaces after separators) several
+    times faster than the stdlib json module; SSE emits one event per token.
+    Returned as bytes so StreamingResponse can send it without re-encoding.
+    """
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def model_response(model: BaseModel) -> ORJSONResponse:
+    """Render a pydantic model as an orjson response.
+
+    Returning the model itself makes FastAPI run jsonable_encoder over it
+    and then encode; this does a single model_dump plus one orjson pass.
+    """
+    return ORJSONResponse(model.model_dump(mode="json"))
+
+
+@dataclass(frozen=True, slots=True)
+class StreamEvent:
+    """A streamed event in both forms: the dict for in-process consumers
+    (e.g. the query logger) and the SSE bytes for the client."""
+
+    type: str
+    payload: dict
+    sse: bytes
+
+
+def stream_event(payload: dict) -> StreamEvent:
+    """Serialize once and keep the source dict alongside the bytes."""
+    return StreamEvent(type=payload["type"], payload=payload, sse=sse_event(payload))
+
+
+def file_too_large_detail(max_bytes: int) -> str:
+    """The 413 detail for an upload over max_bytes.
+
+    Shared by the body-size middleware and the upload handler so clients
+    see one error whichever of them turns the upload away.
+    """
+    return f"File exceeds maximum size of {max_bytes / (1024 * 1024):.0f} MB."
+
+
+def app_singleton(state: Any, name: str, factory: Callable[[], T]) -> T:
+    """Return ``state.<name>``, creating it with ``factory`` on first use.
+
+    For SDK clients (BigQuery, GCS) that are expensive to build but safe
+    to share: one instance per app instead of one per request. Creation
+    is lazy so disabled endpoints never need credentials, and a failed
+    factory call is not cached — the next request retries.
+    """
+    instance = getattr(state, name, None)
+    if instance is None:
+        instance = factory()
+        setattr(state, name, instance)
+    return instance
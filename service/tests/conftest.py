@@ -7,16 +7,54 @@ package. Production runs Python 3.12 in Docker where this isn't an issue.
 
 import sys
 import types
-from unittest.mock import MagicMock
+from collections.abc import Callable
 
+import httpx
 import pytest
+from fastapi import FastAPI
+from starlette.datastructures import State
+
+
+class _StubCollection:
+    """The slice of chromadb's Collection the retriever calls."""
+
+    def query(self, *args: object, **kwargs: object) -> dict:
+        return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+class _StubHttpClient:
+    """Plain stand-in for chromadb.HttpClient.
+
+    A real class rather than MagicMock, so attribute access doesn't spawn
+    child mocks. Tests that assert on client calls patch in their own.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        pass
+
+    def get_collection(self, *args: object, **kwargs: object) -> _StubCollection:
+        return _StubCollection()
+
+    def get_or_create_collection(
+        self, *args: object, **kwargs: object
+    ) -> _StubCollection:
+        return _StubCollection()
+
+
+async def _stub_async_http_client(*args: object, **kwargs: object) -> None:
+    """Stand-in for the chromadb.AsyncHttpClient coroutine factory."""
+    return None
+
 
 # Inject a stub 'chromadb' into sys.modules BEFORE anything imports it.
-# This prevents the Pydantic V1 crash on Python 3.14.
+# This prevents the Pydantic V1 crash on Python 3.14. Only the names the
+# app references are defined.
 if "chromadb" not in sys.modules:
-    _mock_chromadb = types.ModuleType("chromadb")
-    _mock_chromadb.HttpClient = MagicMock  # type: ignore[attr-defined]
-    sys.modules["chromadb"] = _mock_chromadb
+    _stub_chromadb = types.ModuleType("chromadb")
+    _stub_chromadb.HttpClient = _StubHttpClient  # type: ignore[attr-defined]
+    _stub_chromadb.AsyncHttpClient = _stub_async_http_client  # type: ignore[attr-defined]
+    _stub_chromadb.AsyncClientAPI = object  # type: ignore[attr-defined]
+    sys.modules["chromadb"] = _stub_chromadb
 
 from app.config import Settings
 
@@ -37,3 +75,35 @@ def settings() -> Settings:
         gcs_uploads_bucket="",
         bigquery_observability_dataset="",
     )
+
+
+@pytest.fixture(scope="module")
+async def aclient(app: FastAPI):
+    """httpx client driving the module's ``app`` fixture on the test loop.
+
+    Requests go straight through ASGITransport, with no TestClient portal
+    thread per call, and one client (and transport) serves the whole module.
+    Modules that need per-test state reset ``app.state`` instead.
+    """
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.fixture
+def use_settings(
+    app: FastAPI, aclient: httpx.AsyncClient
+) -> Callable[[Settings], httpx.AsyncClient]:
+    """Point the module's app at the given settings, with fresh state.
+
+    State is replaced rather than updated so SDK clients cached by an
+    earlier test (under a different mock or patch) aren't reused.
+    """
+
+    def apply(settings: Settings) -> httpx.AsyncClient:
+        app.state = State()
+        app.state.settings = settings
+        return aclient
+
+    return apply
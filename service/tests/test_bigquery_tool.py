@@ -243,6 +243,25 @@ class TestBigQueryToolExecution:
         assert result["ok"] is True
         assert result["data"] is not None
 
+    @patch("google.cloud.bigquery.Client")
+    @patch("google.cloud.bigquery.QueryJobConfig")
+    def test_client_is_reused_across_calls(
+        self,
+        mock_job_config_cls: MagicMock,
+        mock_client_cls: MagicMock,
+    ) -> None:
+        tool_fn = create_bigquery_tool(
+            PROJECT, DATASET,
+            allowed_tables=ALLOWED_TABLES,
+        )
+        mock_client_cls.return_value.query.return_value.result.return_value = []
+
+        sql = f"SELECT COUNT(*) as cnt FROM {PROJECT}.{DATASET}.uptime_events"
+        tool_fn.invoke(sql)
+        tool_fn.invoke(sql)
+
+        mock_client_cls.assert_called_once_with(project=PROJECT)
+
     def test_tool_returns_validation_error(self) -> None:
         tool_fn = create_bigquery_tool(
             PROJECT, DATASET,
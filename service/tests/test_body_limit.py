@@ -0,0 +1,63 @@
+"""Tests for the Content-Length body size limit middleware."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware.body_limit import BodySizeLimitMiddleware
+
+_DETAIL = "File exceeds maximum size of 0 MB."
+
+
+@pytest.fixture(scope="module")
+def app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, rules={"/api/upload": (10, _DETAIL)})
+
+    @app.post("/api/upload")
+    async def upload() -> dict[str, str]:
+        app.state.calls.append("upload")
+        return {"msg": "ok"}
+
+    @app.post("/api/chat")
+    async def chat() -> dict[str, str]:
+        app.state.calls.append("chat")
+        return {"msg": "ok"}
+
+    return app
+
+
+@pytest.fixture
+def calls(app: FastAPI) -> list[str]:
+    """Handlers reached during this test."""
+    app.state.calls = []
+    return app.state.calls
+
+
+class TestBodySizeLimitMiddleware:
+    async def test_oversized_content_length_returns_413(
+        self, aclient: httpx.AsyncClient, calls: list[str]
+    ) -> None:
+        resp = await aclient.post("/api/upload", content=b"x" * 11)
+
+        assert resp.status_code == 413
+        assert resp.json()["detail"] == _DETAIL
+        assert calls == []
+
+    async def test_within_limit_passes_through(
+        self, aclient: httpx.AsyncClient, calls: list[str]
+    ) -> None:
+        resp = await aclient.post("/api/upload", content=b"x" * 10)
+
+        assert resp.status_code == 200
+        assert calls == ["upload"]
+
+    async def test_unlisted_paths_are_not_limited(
+        self, aclient: httpx.AsyncClient, calls: list[str]
+    ) -> None:
+        resp = await aclient.post("/api/chat", content=b"x" * 100)
+
+        assert resp.status_code == 200
+        assert calls == ["chat"]
@@ -7,7 +7,14 @@ import pytest
 from langchain_core.documents import Document
 from langchain_core.messages import AIMessage
 
-from app.rag.chain import RAGChain, RAGResponse, _sse
+from app.rag.chain import RAGChain, RAGResponse
+from app.utils import sse_event, stream_event
+
+
+async def _fake_astream(messages):
+    """An llm.astream stand-in yielding two content chunks."""
+    yield MagicMock(content="AdGuard ")
+    yield MagicMock(content="runs on CT 102.")
 
 
 @pytest.fixture
@@ -23,6 +30,9 @@ def mock_retriever() -> MagicMock:
             metadata={"source": "homelab-dns.md", "similarity_score": 0.72},
         ),
     ]
+    # The streaming path awaits ainvoke; route it through invoke so tests
+    # configure a single return_value / side_effect.
+    retriever.ainvoke = AsyncMock(side_effect=lambda query: retriever.invoke(query))
     return retriever
 
 
@@ -32,6 +42,8 @@ def mock_llm() -> MagicMock:
     llm.invoke.return_value = AIMessage(
         content="AdGuard runs on CT 102 [Source 1]. DNS rewrites are configured for *.lab.atilho.com [Source 2]."
     )
+    # ainvoke answers like invoke; tests check that invoke is never reached.
+    llm.ainvoke = AsyncMock(side_effect=lambda messages: llm.invoke.return_value)
     return llm
 
 
@@ -126,24 +138,37 @@ class TestRAGChainInvoke:
         assert "DNS rewrites point *.lab.atilho.com" in messages[1].content
 
 
+class TestRAGChainAinvoke:
+    async def test_uses_async_retrieval_and_generation(
+        self, chain: RAGChain, mock_retriever: MagicMock, mock_llm: MagicMock
+    ) -> None:
+        result = await chain.ainvoke("Where does AdGuard run?")
+
+        assert "[Source 1]" in result.answer
+        assert result.retrieval_count == 2
+        mock_retriever.ainvoke.assert_awaited_once()
+        mock_llm.ainvoke.assert_awaited_once()
+        mock_llm.invoke.assert_not_called()
+
+    async def test_empty_retrieval_skips_llm(
+        self, chain: RAGChain, mock_retriever: MagicMock, mock_llm: MagicMock
+    ) -> None:
+        mock_retriever.invoke.return_value = []
+
+        result = await chain.ainvoke("something with no docs")
+
+        assert "couldn't find" in result.answer.lower()
+        assert result.retrieval_count == 0
+        mock_llm.ainvoke.assert_not_called()
+
+
 class TestRAGChainStream:
-    @pytest.mark.asyncio
     async def test_stream_yields_tokens_then_sources(
         self,
         mock_retriever: MagicMock,
         mock_llm: MagicMock,
     ) -> None:
-        # Set up async streaming
-        chunk1 = MagicMock()
-        chunk1.content = "AdGuard "
-        chunk2 = MagicMock()
-        chunk2.content = "runs on CT 102."
-
-        async def fake_astream(messages):
-            yield chunk1
-            yield chunk2
-
-        mock_llm.astream = fake_astream
+        mock_llm.astream = _fake_astream
 
         chain = RAGChain(
             retriever=mock_retriever,
@@ -155,14 +180,14 @@ class TestRAGChainStream:
         async for event in chain.stream("Where does AdGuard run?"):
             events.append(event)
 
-        # Should have: 2 tokens + 1 sources + 1 done
-        assert len(events) == 4
-        assert '"type": "token"' in events[0]
-        assert '"type": "token"' in events[1]
-        assert '"type": "sources"' in events[2]
-        assert '"type": "done"' in events[3]
+        # Should have: 1 status + 2 tokens + 1 sources + 1 done
+        assert len(events) == 5
+        assert events[0].type == "status"
+        assert events[1].type == "token"
+        assert events[2].type == "token"
+        assert events[3].type == "sources"
+        assert events[4].type == "done"
 
-    @pytest.mark.asyncio
     async def test_stream_empty_retrieval(
         self,
         mock_retriever: MagicMock,
@@ -180,10 +205,9 @@ class TestRAGChainStream:
         async for event in chain.stream("nonexistent"):
             events.append(event)
 
-        assert len(events) == 2  # fallback token + done
-        assert "couldn't find" in events[0].lower()
+        assert len(events) == 3  # status + fallback token + done
+        assert "couldn't find" in events[1].payload["content"].lower()
 
-    @pytest.mark.asyncio
     async def test_stream_error_yields_error_and_done(
         self,
         mock_retriever: MagicMock,
@@ -201,14 +225,52 @@ class TestRAGChainStream:
         async for event in chain.stream("will fail"):
             events.append(event)
 
-        assert len(events) == 2
-        assert '"type": "error"' in events[0]
-        assert '"type": "done"' in events[1]
+        assert len(events) == 3
+        assert events[0].type == "status"
+        assert events[1].type == "error"
+        assert events[2].type == "done"
+
+    async def test_stream_awaits_prefetch_before_retrieval(
+        self,
+        mock_retriever: MagicMock,
+        mock_llm: MagicMock,
+    ) -> None:
+        mock_retriever.invoke.return_value = []
+        order: list[str] = []
+
+        async def prefetch() -> None:
+            order.append("prefetch")
+
+        mock_retriever.ainvoke = AsyncMock(
+            side_effect=lambda query: order.append("retrieve") or []
+        )
+
+        chain = RAGChain(
+            retriever=mock_retriever,
+            llm=mock_llm,
+            model_name="test/model",
+        )
+
+        async for _ in chain.stream("q", prefetch=prefetch()):
+            pass
+
+        assert order == ["prefetch", "retrieve"]
 
 
 class TestSSEFormat:
     def test_sse_format(self) -> None:
-        result = _sse({"type": "token", "content": "hello"})
-        assert result.startswith("data: ")
-        assert result.endswith("\n\n")
-        assert '"type": "token"' in result
+        result = sse_event({"type": "token", "content": "hello"})
+        assert result.startswith(b"data: ")
+        assert result.endswith(b"\n\n")
+        assert b'"type":"token"' in result
+
+    def test_sse_non_ascii_is_raw_utf8(self) -> None:
+        """orjson writes UTF-8 directly instead of \\u escapes."""
+        result = sse_event({"type": "token", "content": "café ✓"})
+        assert "café ✓".encode() in result
+
+    def test_stream_event_keeps_payload_and_bytes(self) -> None:
+        event = stream_event({"type": "done", "model": "m"})
+        assert event.type == "done"
+        assert event.payload == {"type": "done", "model": "m"}
+        assert event.sse == sse_event({"type": "done", "model": "m"})
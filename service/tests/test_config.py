@@ -12,6 +12,12 @@ _BASE = dict(
 )
 
 
+@pytest.fixture(scope="module")
+def default_settings() -> Settings:
+    """One validated Settings for tests that only read defaults or helpers."""
+    return Settings(**_BASE)
+
+
 class TestSQLPolicyValidation:
     """SQL policy settings are validated at startup."""
 
@@ -37,14 +43,18 @@ class TestSQLPolicyValidation:
         assert s.sql_policy_mode == "flex"
         assert s.get_allowed_tables_set() == frozenset()
 
-    def test_get_allowed_tables_set_strips_whitespace(self) -> None:
-        s = Settings(**_BASE, sql_allowed_tables=" t1 , t2 , t3 ")
+    def test_get_allowed_tables_set_strips_whitespace(
+        self, default_settings: Settings
+    ) -> None:
+        # Exercises the parser, not validation, so skip re-validating.
+        s = default_settings.model_copy(
+            update={"sql_allowed_tables": " t1 , t2 , t3 "}
+        )
         assert s.get_allowed_tables_set() == frozenset({"t1", "t2", "t3"})
 
-    def test_default_policy_is_strict(self) -> None:
-        s = Settings(**_BASE)
-        assert s.sql_policy_mode == "strict"
-        assert len(s.get_allowed_tables_set()) > 0
+    def test_default_policy_is_strict(self, default_settings: Settings) -> None:
+        assert default_settings.sql_policy_mode == "strict"
+        assert len(default_settings.get_allowed_tables_set()) > 0
 
 
 class TestRetrievalTuningValidation:
@@ -69,3 +79,43 @@ class TestRetrievalTuningValidation:
         assert s.retrieval_candidate_k == 25
         assert s.retrieval_final_k == 7
         assert s.rerank_enabled is True
+
+
+class TestChromaDBUrlParsing:
+    """chromadb_url is split into client connection parts (cached per URL)."""
+
+    def test_https_url(self) -> None:
+        s = Settings(**{**_BASE, "chromadb_url": "https://chromadb-test.run.app/"})
+        assert s.chromadb_host == "chromadb-test.run.app"
+        assert s.chromadb_port == 443
+        assert s.chromadb_ssl is True
+
+    def test_http_url(self) -> None:
+        s = Settings(**{**_BASE, "chromadb_url": "http://localhost"})
+        assert s.chromadb_host == "localhost"
+        assert s.chromadb_port == 8000
+        assert s.chromadb_ssl is False
+
+    def test_model_copy_with_new_url_is_reparsed(self) -> None:
+        s = Settings(**{**_BASE, "chromadb_url": "https://chromadb-test.run.app"})
+        copy = s.model_copy(update={"chromadb_url": "http://localhost"})
+        assert copy.chromadb_host == "localhost"
+        assert copy.chromadb_port == 8000
+        assert copy.chromadb_ssl is False
+
+
+class TestParsedAllowlists:
+    """Comma-separated allowlists are parsed once per value."""
+
+    def test_extensions_set_is_reused(self, default_settings: Settings) -> None:
+        first = default_settings.get_allowed_extensions_set()
+        assert default_settings.get_allowed_extensions_set() is first
+        assert "md" in first
+
+    def test_updated_value_is_reparsed(self, default_settings: Settings) -> None:
+        default_settings.get_allowed_extensions_set()
+        s = default_settings.model_copy(
+            update={"allowed_upload_extensions": " MD , Txt "}
+        )
+        assert s.get_allowed_extensions_set() == frozenset({"md", "txt"})
+        assert "yaml" in default_settings.get_allowed_extensions_set()
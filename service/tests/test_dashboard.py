@@ -2,30 +2,124 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
 from datetime import date, datetime, timezone
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from fastapi import FastAPI
-from fastapi.testclient import TestClient
 
 from app.config import Settings
 from app.routers import dashboard
+from app.routers.dashboard import DashboardOverviewResponse
+
+
+def _section_for(sql: str) -> str:
+    """Map a dashboard SQL statement to its response section."""
+    if "query_log" in sql:
+        return "query_activity"
+    if "ingestion_log" in sql:
+        return "recent_ingestions"
+    if "resource_utilization" in sql:
+        return "resource_utilization"
+    if "uptime_percent" in sql:
+        return "uptime_summary"
+    return "service_health"
+
+
+# One row per section, shared by the tests that don't modify them.
+_SECTION_ROWS: dict[str, list[dict]] = {
+    "service_health": [
+        {
+            "service_name": "adguard",
+            "status": "up",
+            "response_time_ms": 12.3,
+            "checked_at": datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
+        },
+    ],
+    "uptime_summary": [
+        {
+            "service_name": "adguard",
+            "uptime_percent": 99.5,
+            "total_checks": 168,
+            "avg_response_ms": 15.2,
+        },
+    ],
+    "resource_utilization": [
+        {
+            "node": "pve01",
+            "cpu_percent": 22.1,
+            "memory_percent": 48.3,
+            "storage_percent": 37.8,
+            "collected_at": datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
+        },
+    ],
+    "query_activity": [
+        {
+            "query_date": date(2026, 2, 15),
+            "total_queries": 42,
+            "successful": 40,
+            "failed": 2,
+            "avg_latency_ms": 1250.3,
+            "rag_queries": 30,
+            "metrics_queries": 8,
+            "hybrid_queries": 4,
+        },
+    ],
+    "recent_ingestions": [
+        {
+            "file_name": "dns-setup.md",
+            "file_type": "md",
+            "status": "success",
+            "chunk_count": 8,
+            "total_time_ms": 2100.0,
+            "timestamp": datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
+        },
+    ],
+}
+
+
+class _StubBigQueryClient:
+    """query_and_wait routed by section, without MagicMock call recording."""
+
+    __slots__ = ("rows", "failing")
+
+    def __init__(
+        self, rows: dict[str, list[dict]] | None = None, failing: str | None = None
+    ) -> None:
+        self.rows = rows or {}
+        self.failing = failing
+
+    def query_and_wait(self, sql: str, **kwargs) -> list[dict]:
+        section = _section_for(sql)
+        if section == self.failing:
+            raise Exception(f"BQ error on {section} query")
+        return self.rows.get(section, [])
 
 
-def _make_app(settings: Settings) -> FastAPI:
+@pytest.fixture(autouse=True)
+def _clear_overview_cache():
+    """The overview cache is module-level; don't leak responses across tests."""
+    dashboard._CACHE.clear()
+    yield
+    dashboard._CACHE.clear()
+
+
+@pytest.fixture(scope="module")
+def app() -> FastAPI:
+    """One app with the dashboard router for the whole module."""
     app = FastAPI()
     app.include_router(dashboard.router)
-    app.state.settings = settings
     return app
 
 
 @pytest.fixture
 def enabled_settings(settings: Settings) -> Settings:
     """Settings with dashboard enabled (both datasets configured)."""
-    return Settings(
-        **{
-            **settings.model_dump(),
+    return settings.model_copy(
+        update={
             "bigquery_observability_dataset": "test_observability",
             "bigquery_metrics_dataset": "test_infra_metrics",
         }
@@ -33,102 +127,48 @@ def enabled_settings(settings: Settings) -> Settings:
 
 
 @pytest.fixture
-def client(settings: Settings) -> TestClient:
+def client(
+    use_settings: Callable[[Settings], httpx.AsyncClient], settings: Settings
+) -> httpx.AsyncClient:
     """Client with dashboard disabled."""
-    return TestClient(_make_app(settings))
+    return use_settings(settings)
 
 
 @pytest.fixture
-def enabled_client(enabled_settings: Settings) -> TestClient:
+def enabled_client(
+    use_settings: Callable[[Settings], httpx.AsyncClient],
+    enabled_settings: Settings,
+) -> httpx.AsyncClient:
     """Client with dashboard enabled."""
-    return TestClient(_make_app(enabled_settings))
+    return use_settings(enabled_settings)
 
 
 class TestDashboardOverview:
-    def test_disabled_returns_503(self, client: TestClient) -> None:
-        resp = client.get("/api/dashboard/overview")
+    async def test_disabled_returns_503(self, client: httpx.AsyncClient) -> None:
+        resp = await client.get("/api/dashboard/overview")
         assert resp.status_code == 503
         assert "not configured" in resp.json()["detail"]
 
-    def test_obs_only_returns_503(self, settings: Settings) -> None:
+    async def test_obs_only_returns_503(
+        self,
+        use_settings: Callable[[Settings], httpx.AsyncClient],
+        settings: Settings,
+    ) -> None:
         """Dashboard requires BOTH datasets — obs only is not enough."""
-        s = Settings(
-            **{**settings.model_dump(), "bigquery_observability_dataset": "obs"}
-        )
-        client = TestClient(_make_app(s))
-        resp = client.get("/api/dashboard/overview")
+        s = settings.model_copy(update={"bigquery_observability_dataset": "obs"})
+        client = use_settings(s)
+        resp = await client.get("/api/dashboard/overview")
         assert resp.status_code == 503
 
     @patch("app.routers.dashboard.bigquery")
-    def test_returns_all_sections(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_returns_all_sections(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
-        mock_client = MagicMock()
-        mock_bq.Client.return_value = mock_client
+        # Sections run concurrently, so the stub routes rows by the SQL
+        # text rather than by call order.
+        mock_bq.Client.return_value = _StubBigQueryClient(_SECTION_ROWS)
 
-        # Each query returns one mock row as a dict
-        health_row = {
-            "service_name": "adguard",
-            "status": "up",
-            "response_time_ms": 12.3,
-            "checked_at": datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
-        }
-        uptime_row = {
-            "service_name": "adguard",
-            "uptime_percent": 99.5,
-            "total_checks": 168,
-            "avg_response_ms": 15.2,
-        }
-        resource_row = {
-            "node": "pve01",
-            "cpu_percent": 22.1,
-            "memory_percent": 48.3,
-            "storage_percent": 37.8,
-            "collected_at": datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
-        }
-        query_row = {
-            "query_date": date(2026, 2, 15),
-            "total_queries": 42,
-            "successful": 40,
-            "failed": 2,
-            "avg_latency_ms": 1250.3,
-            "rag_queries": 30,
-            "metrics_queries": 8,
-            "hybrid_queries": 4,
-        }
-        ingestion_row = {
-            "file_name": "dns-setup.md",
-            "file_type": "md",
-            "status": "success",
-            "chunk_count": 8,
-            "total_time_ms": 2100.0,
-            "timestamp": datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
-        }
-
-        mock_client.query.return_value.result.return_value = iter(
-            [MagicMock(**{"__iter__": lambda s: iter([health_row]), "items": health_row.items})]
-        )
-
-        # Simpler approach: make each query().result() return an iterable of dicts
-        results = [
-            [health_row],
-            [uptime_row],
-            [resource_row],
-            [query_row],
-            [ingestion_row],
-        ]
-        call_idx = {"i": 0}
-
-        def fake_query(sql, **kwargs):
-            idx = call_idx["i"]
-            call_idx["i"] += 1
-            mock_result = MagicMock()
-            mock_result.result.return_value = results[idx] if idx < len(results) else []
-            return mock_result
-
-        mock_client.query.side_effect = fake_query
-
-        resp = enabled_client.get("/api/dashboard/overview")
+        resp = await enabled_client.get("/api/dashboard/overview")
         assert resp.status_code == 200
         data = resp.json()
         assert len(data["service_health"]) == 1
@@ -136,88 +176,192 @@ class TestDashboardOverview:
         assert len(data["resource_utilization"]) == 1
         assert len(data["query_activity"]) == 1
         assert len(data["recent_ingestions"]) == 1
+        assert data["uptime_summary"][0]["uptime_percent"] == 99.5
+        assert data["resource_utilization"][0]["node"] == "pve01"
 
     @patch("app.routers.dashboard.bigquery")
-    def test_partial_failure_returns_empty_section(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_partial_failure_returns_empty_section(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         """If one query fails, that section returns [] but others succeed."""
-        mock_client = MagicMock()
-        mock_bq.Client.return_value = mock_client
-
-        call_idx = {"i": 0}
-
-        def fake_query(sql, **kwargs):
-            idx = call_idx["i"]
-            call_idx["i"] += 1
-            if idx == 0:
-                raise Exception("BQ error on first query")
-            mock_result = MagicMock()
-            mock_result.result.return_value = []
-            return mock_result
-
-        mock_client.query.side_effect = fake_query
+        mock_bq.Client.return_value = _StubBigQueryClient(failing="service_health")
 
-        resp = enabled_client.get("/api/dashboard/overview")
+        resp = await enabled_client.get("/api/dashboard/overview")
         assert resp.status_code == 200
         data = resp.json()
-        # First section failed → []
+        # Service health failed → []
         assert data["service_health"] == []
         # Others should be []  (empty but not failed)
         assert data["uptime_summary"] == []
 
     @patch("app.routers.dashboard.bigquery")
-    def test_empty_datasets(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_empty_datasets(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
-        """Empty datasets should return [] for all sections."""
-        mock_client = MagicMock()
-        mock_bq.Client.return_value = mock_client
+        """Empty datasets: exactly the five section keys, each [].
 
-        mock_result = MagicMock()
-        mock_result.result.return_value = []
-        mock_client.query.return_value = mock_result
+        Shape and emptiness come from the same response, so one request
+        checks both.
+        """
+        mock_bq.Client.return_value = _StubBigQueryClient()
 
-        resp = enabled_client.get("/api/dashboard/overview")
+        resp = await enabled_client.get("/api/dashboard/overview")
         assert resp.status_code == 200
-        data = resp.json()
-        for key in [
-            "service_health",
-            "uptime_summary",
-            "resource_utilization",
-            "query_activity",
-            "recent_ingestions",
-        ]:
-            assert data[key] == []
+        assert resp.json() == {
+            "service_health": [],
+            "uptime_summary": [],
+            "resource_utilization": [],
+            "query_activity": [],
+            "recent_ingestions": [],
+        }
 
     @patch("app.routers.dashboard.bigquery")
-    def test_data_shape(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_bq_client_failure_returns_500(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
-        """Response has exactly the expected top-level keys."""
+        """If BigQuery client creation fails, return 500."""
+        mock_bq.Client.side_effect = Exception("Auth failed")
+        resp = await enabled_client.get("/api/dashboard/overview")
+        assert resp.status_code == 500
+
+    @patch("app.routers.dashboard.bigquery")
+    async def test_windows_use_literal_since_parameter(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        """Literal, minute-quantized bounds: cacheable and partition-prunable."""
         mock_client = MagicMock()
         mock_bq.Client.return_value = mock_client
-        mock_result = MagicMock()
-        mock_result.result.return_value = []
-        mock_client.query.return_value = mock_result
+        mock_client.query_and_wait.return_value = []
+
+        await enabled_client.get("/api/dashboard/overview")
+
+        params = [c.args for c in mock_bq.ScalarQueryParameter.call_args_list]
+        assert len(params) == 2
+        for name, type_, since in params:
+            assert (name, type_) == ("since", "TIMESTAMP")
+            assert since.second == 0 and since.microsecond == 0
+        last_24h, last_7d_days = (p[2] for p in params)
+        assert last_7d_days.hour == 0 and last_7d_days.minute == 0
+        assert last_7d_days < last_24h
+        for call in mock_bq.QueryJobConfig.call_args_list:
+            assert call.kwargs["use_query_cache"] is True
+        for call in mock_client.query_and_wait.call_args_list:
+            sql = call.args[0]
+            assert "CURRENT_TIMESTAMP" not in sql
+            # Recent ingestions are the latest 10 overall, not within a window
+            assert ("@since" in sql) != (_section_for(sql) == "recent_ingestions")
 
-        resp = enabled_client.get("/api/dashboard/overview")
-        assert resp.status_code == 200
-        data = resp.json()
-        expected_keys = {
-            "service_health",
-            "uptime_summary",
-            "resource_utilization",
-            "query_activity",
-            "recent_ingestions",
+    @patch("app.routers.dashboard.bigquery")
+    async def test_rollup_sections_read_daily_views(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = []
+
+        await enabled_client.get("/api/dashboard/overview")
+
+        sql = {
+            _section_for(call.args[0]): call.args[0]
+            for call in mock_client.query_and_wait.call_args_list
         }
-        assert set(data.keys()) == expected_keys
+        assert "test_infra_metrics.uptime_daily" in sql["uptime_summary"]
+        assert "test_observability.query_log_daily" in sql["query_activity"]
+
+
+class TestDashboardSql:
+    def test_formatted_once_per_dataset_triple(self) -> None:
+        first = dashboard._dashboard_sql("p", "obs", "infra")
+        assert dashboard._dashboard_sql("p", "obs", "infra") is first
+        assert set(first) == set(DashboardOverviewResponse.model_fields)
+        assert "`p.infra.uptime_events`" in first["service_health"]
+        assert "`p.obs.ingestion_log`" in first["recent_ingestions"]
 
+
+class TestDashboardOverviewCache:
     @patch("app.routers.dashboard.bigquery")
-    def test_bq_client_failure_returns_500(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_repeat_requests_within_ttl_hit_cache(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = []
+
+        first = await enabled_client.get("/api/dashboard/overview")
+        second = await enabled_client.get("/api/dashboard/overview")
+
+        assert first.status_code == second.status_code == 200
+        assert second.headers["content-type"] == "application/json"
+        assert second.content == first.content
+        assert mock_client.query_and_wait.call_count == 5
+
+    @patch("app.routers.dashboard.bigquery")
+    async def test_zero_ttl_disables_cache(
+        self,
+        mock_bq: MagicMock,
+        use_settings: Callable[[Settings], httpx.AsyncClient],
+        enabled_settings: Settings,
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = []
+        settings = enabled_settings.model_copy(
+            update={"dashboard_cache_ttl_seconds": 0}
+        )
+        client = use_settings(settings)
+
+        await client.get("/api/dashboard/overview")
+        await client.get("/api/dashboard/overview")
+
+        assert mock_client.query_and_wait.call_count == 10
+
+    async def test_zero_ttl_requests_run_concurrently(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        use_settings: Callable[[Settings], httpx.AsyncClient],
+        enabled_settings: Settings,
+    ) -> None:
+        """With caching off, loads don't queue behind the refresh lock."""
+        both_loading = asyncio.Barrier(2)
+
+        async def load(*args: object) -> tuple[DashboardOverviewResponse, bool]:
+            # Times out if the second load waits for the first to finish
+            await asyncio.wait_for(both_loading.wait(), timeout=1.0)
+            return DashboardOverviewResponse(**{k: [] for k in _SECTION_ROWS}), True
+
+        monkeypatch.setattr(dashboard, "_load_overview", load)
+        client = use_settings(
+            enabled_settings.model_copy(update={"dashboard_cache_ttl_seconds": 0})
+        )
+
+        responses = await asyncio.gather(
+            client.get("/api/dashboard/overview"),
+            client.get("/api/dashboard/overview"),
+        )
+
+        assert [r.status_code for r in responses] == [200, 200]
+
+    @patch("app.routers.dashboard.bigquery")
+    async def test_partial_overview_is_not_cached(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_bq.Client.return_value = _StubBigQueryClient(
+            _SECTION_ROWS, failing="service_health"
+        )
+        first = await enabled_client.get("/api/dashboard/overview")
+        assert first.json()["service_health"] == []
+
+        mock_bq.Client.return_value.failing = None
+        second = await enabled_client.get("/api/dashboard/overview")
+        assert len(second.json()["service_health"]) == 1
+
+    @patch("app.routers.dashboard.bigquery")
+    async def test_client_failure_is_not_cached(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
-        """If BigQuery client creation fails, return 500."""
         mock_bq.Client.side_effect = Exception("Auth failed")
-        resp = enabled_client.get("/api/dashboard/overview")
-        assert resp.status_code == 500
+        assert (await enabled_client.get("/api/dashboard/overview")).status_code == 500
+
+        mock_bq.Client.side_effect = None
+        mock_bq.Client.return_value.query_and_wait.return_value = []
+        assert (await enabled_client.get("/api/dashboard/overview")).status_code == 200
@@ -1,22 +1,22 @@
 """Tests for the health endpoint."""
 
+import httpx
 import pytest
 from fastapi import FastAPI
-from fastapi.testclient import TestClient
 
 from app.routers.health import router
 
 
-@pytest.fixture
-def client() -> TestClient:
+@pytest.fixture(scope="module")
+def app() -> FastAPI:
     app = FastAPI()
     app.include_router(router)
-    return TestClient(app)
+    return app
 
 
 class TestHealthEndpoint:
-    def test_health_returns_ok(self, client: TestClient) -> None:
-        response = client.get("/api/health")
+    async def test_health_returns_ok(self, aclient: httpx.AsyncClient) -> None:
+        response = await aclient.get("/api/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
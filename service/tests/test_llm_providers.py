@@ -1,6 +1,6 @@
 """Tests for LLM provider abstraction and factory."""
 
-from unittest.mock import patch
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -8,6 +8,19 @@ from app.config import Settings
 from app.llm.provider import LLMProvider, create_provider
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _stub_chat_models():
+    """Stand in for the chat model classes once for the whole module.
+
+    Providers import them lazily from these modules, so patching the
+    module attribute is enough; no test here inspects the mocks.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("langchain_google_vertexai.ChatVertexAI", MagicMock())
+        mp.setattr("langchain_openai.ChatOpenAI", MagicMock())
+        yield
+
+
 @pytest.fixture
 def vertex_settings(settings: Settings) -> Settings:
     settings.llm_provider = "vertex_ai"
@@ -26,28 +39,19 @@ class TestCreateProvider:
         with pytest.raises(ValueError, match="Unknown LLM provider"):
             create_provider(settings)
 
-    @patch("app.llm.vertex_ai.ChatVertexAI")
-    def test_vertex_ai_factory(
-        self, mock_chat: object, vertex_settings: Settings
-    ) -> None:
+    def test_vertex_ai_factory(self, vertex_settings: Settings) -> None:
         provider = create_provider(vertex_settings)
         assert isinstance(provider, LLMProvider)
         assert "vertex_ai" in provider.get_model_name()
 
-    @patch("app.llm.openrouter.ChatOpenAI")
-    def test_openrouter_factory(
-        self, mock_chat: object, openrouter_settings: Settings
-    ) -> None:
+    def test_openrouter_factory(self, openrouter_settings: Settings) -> None:
         provider = create_provider(openrouter_settings)
         assert isinstance(provider, LLMProvider)
         assert "openrouter" in provider.get_model_name()
 
 
 class TestVertexAIProvider:
-    @patch("app.llm.vertex_ai.ChatVertexAI")
-    def test_get_chat_model(
-        self, mock_cls: object, vertex_settings: Settings
-    ) -> None:
+    def test_get_chat_model(self, vertex_settings: Settings) -> None:
         provider = create_provider(vertex_settings)
         model = provider.get_chat_model()
         assert model is not None
@@ -58,10 +62,7 @@ class TestVertexAIProvider:
 
 
 class TestOpenRouterProvider:
-    @patch("app.llm.openrouter.ChatOpenAI")
-    def test_get_chat_model(
-        self, mock_cls: object, openrouter_settings: Settings
-    ) -> None:
+    def test_get_chat_model(self, openrouter_settings: Settings) -> None:
         provider = create_provider(openrouter_settings)
         model = provider.get_chat_model()
         assert model is not None
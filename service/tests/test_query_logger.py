@@ -0,0 +1,28 @@
+"""Tests for background query logging."""
+
+from unittest.mock import patch
+
+from app.observability.logger import drain_pending_logs, log_query_background
+
+
+class TestLogQueryBackground:
+    def test_empty_table_is_skipped(self) -> None:
+        with patch("app.observability.logger.log_query") as mock_log:
+            log_query_background("", query="q", model_used="m")
+
+        mock_log.assert_not_called()
+
+    def test_runs_inline_outside_event_loop(self) -> None:
+        with patch("app.observability.logger.log_query") as mock_log:
+            log_query_background("p.d.t", query="q", model_used="m")
+
+        mock_log.assert_called_once_with("p.d.t", query="q", model_used="m")
+
+    async def test_does_not_block_the_caller(self) -> None:
+        with patch("app.observability.logger.log_query") as mock_log:
+            log_query_background("p.d.t", query="q", model_used="m")
+            # Scheduled, not yet run on the caller's stack.
+            mock_log.assert_not_called()
+            await drain_pending_logs()
+
+        mock_log.assert_called_once_with("p.d.t", query="q", model_used="m")
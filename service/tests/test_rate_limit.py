@@ -2,90 +2,104 @@
 
 from __future__ import annotations
 
-from fastapi import FastAPI, Request
-from fastapi.testclient import TestClient
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
 
 from app.middleware.rate_limit import RateLimitMiddleware
 
 
-def _make_app(rules: dict[str, int], window_seconds: int = 60) -> FastAPI:
+@pytest.fixture(scope="module")
+def app() -> FastAPI:
+    """One app for the module; tests set its rules through ``rules``."""
     app = FastAPI()
-    app.add_middleware(
-        RateLimitMiddleware, rules=rules, window_seconds=window_seconds
-    )
+    app.add_middleware(RateLimitMiddleware, rules={})
 
-    @app.post("/api/chat")
-    async def chat() -> dict[str, str]:
+    # The limiter only looks at the path, so one catch-all route stands in
+    # for /api/chat, /api/upload, /api/upload/status and /api/health.
+    @app.api_route("/api/{name:path}", methods=["GET", "POST"])
+    async def any_route(name: str) -> dict[str, str]:
         return {"msg": "ok"}
 
-    @app.post("/api/upload")
-    async def upload() -> dict[str, str]:
-        return {"msg": "ok"}
+    # Build the stack now (Starlette otherwise does it on the first
+    # request) so the limiter instance can be reached and reset.
+    app.middleware_stack = app.build_middleware_stack()
+    return app
 
-    @app.get("/api/upload/status")
-    async def upload_status() -> dict[str, str]:
-        return {"status": "processing"}
 
-    @app.get("/api/health")
-    async def health() -> dict[str, str]:
-        return {"status": "ok"}
-
-    return app
+@pytest.fixture
+def rules(app: FastAPI) -> dict[str, int]:
+    """The live limiter's rules, emptied along with its hit counters."""
+    limiter = app.middleware_stack
+    while not isinstance(limiter, RateLimitMiddleware):
+        limiter = limiter.app
+    limiter.rules.clear()
+    limiter._hits.clear()
+    return limiter.rules
 
 
 class TestRateLimitMiddleware:
-    def test_triggers_429_after_threshold(self) -> None:
-        app = _make_app({"/api/upload": 3})
-        client = TestClient(app)
+    async def test_triggers_429_after_threshold(
+        self, aclient: httpx.AsyncClient, rules: dict[str, int]
+    ) -> None:
+        rules.update({"/api/upload": 3})
 
-        for _ in range(3):
-            resp = client.post("/api/upload")
-            assert resp.status_code == 200
+        # The limiter checks and records a hit with no await in between,
+        # so a concurrent burst is counted exactly.
+        burst = await asyncio.gather(*(aclient.post("/api/upload") for _ in range(3)))
+        assert [r.status_code for r in burst] == [200] * 3
 
-        resp = client.post("/api/upload")
+        resp = await aclient.post("/api/upload")
         assert resp.status_code == 429
         assert "Rate limit" in resp.json()["detail"]
 
-    def test_retry_after_header(self) -> None:
-        app = _make_app({"/api/upload": 1})
-        client = TestClient(app)
+    async def test_retry_after_header(
+        self, aclient: httpx.AsyncClient, rules: dict[str, int]
+    ) -> None:
+        rules.update({"/api/upload": 1})
 
-        client.post("/api/upload")
-        resp = client.post("/api/upload")
+        await aclient.post("/api/upload")
+        resp = await aclient.post("/api/upload")
         assert resp.status_code == 429
         assert "Retry-After" in resp.headers
 
-    def test_unmatched_path_not_limited(self) -> None:
-        app = _make_app({"/api/upload": 1})
-        client = TestClient(app)
+    async def test_unmatched_path_not_limited(
+        self, aclient: httpx.AsyncClient, rules: dict[str, int]
+    ) -> None:
+        rules.update({"/api/upload": 1})
 
         # Health endpoint should never be rate limited
         for _ in range(10):
-            resp = client.get("/api/health")
+            resp = await aclient.get("/api/health")
             assert resp.status_code == 200
 
-    def test_different_paths_independent(self) -> None:
-        app = _make_app({"/api/upload": 2, "/api/chat": 2})
-        client = TestClient(app)
+    async def test_different_paths_independent(
+        self, aclient: httpx.AsyncClient, rules: dict[str, int]
+    ) -> None:
+        rules.update({"/api/upload": 2, "/api/chat": 2})
 
         # Exhaust upload limit
         for _ in range(2):
-            client.post("/api/upload")
-        assert client.post("/api/upload").status_code == 429
+            await aclient.post("/api/upload")
+        assert (await aclient.post("/api/upload")).status_code == 429
 
         # Chat should still work
-        assert client.post("/api/chat").status_code == 200
+        assert (await aclient.post("/api/chat")).status_code == 200
 
-    def test_upload_status_not_throttled_by_upload_rule(self) -> None:
+    async def test_upload_status_not_throttled_by_upload_rule(
+        self, aclient: httpx.AsyncClient, rules: dict[str, int]
+    ) -> None:
         """GET /api/upload/status must not be throttled by the /api/upload rule."""
-        app = _make_app({"/api/upload": 1})
-        client = TestClient(app)
+        rules.update({"/api/upload": 1})
 
         # Exhaust the /api/upload limit
-        client.post("/api/upload")
-        assert client.post("/api/upload").status_code == 429
+        await aclient.post("/api/upload")
+        assert (await aclient.post("/api/upload")).status_code == 429
 
         # Polling the status sub-path should still succeed (exact match only)
-        for _ in range(20):
-            resp = client.get("/api/upload/status")
-            assert resp.status_code == 200
+        responses = await asyncio.gather(
+            *(aclient.get("/api/upload/status") for _ in range(20))
+        )
+        assert [r.status_code for r in responses] == [200] * 20
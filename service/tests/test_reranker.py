@@ -2,9 +2,43 @@
 
 from __future__ import annotations
 
+import sys
+import types
+
+import pytest
 from langchain_core.documents import Document
 
-from app.rag.reranker import CrossEncoderReranker, NoOpReranker
+from app.rag.reranker import CrossEncoderReranker, NoOpReranker, _ONNXCrossEncoder
+
+
+class _FakePredict:
+    """CrossEncoder stand-in that returns fixed scores."""
+
+    __slots__ = ("scores",)
+
+    def __init__(self, scores: list[float]) -> None:
+        self.scores = scores
+
+    def predict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        return self.scores
+
+
+class _FakeOutput:
+    """ONNX model output stand-in carrying only the logits."""
+
+    __slots__ = ("logits",)
+
+    def __init__(self, logits: object) -> None:
+        self.logits = logits
+
+
+@pytest.fixture(scope="module")
+def ce_reranker() -> CrossEncoderReranker:
+    """One reranker for the module; each test installs its own fake model."""
+    return CrossEncoderReranker(
+        model_name="cross-encoder/ms-marco-MiniLM-L-6-v2",
+        max_candidates=5,
+    )
 
 
 class TestNoOpReranker:
@@ -23,39 +57,94 @@ class TestNoOpReranker:
         assert out[1].metadata["retrieval_rank"] == 2
         assert out[1].metadata["rerank_rank"] == 2
 
+    def test_does_not_mutate_input_metadata(self) -> None:
+        metadata = {"similarity_score": 0.9, "rerank_rank": 7}
+        docs = [Document(page_content="doc1", metadata=metadata)]
+
+        out = NoOpReranker().rerank("query", docs, top_k=1)
+
+        assert out[0].metadata is not metadata
+        assert out[0].metadata["rerank_rank"] == 7
+        assert out[0].metadata["rerank_score"] == 0.9
+        assert metadata == {"similarity_score": 0.9, "rerank_rank": 7}
+
 
 class TestCrossEncoderReranker:
-    def test_reorders_by_cross_encoder_score(self) -> None:
+    def test_reorders_by_cross_encoder_score(
+        self, ce_reranker: CrossEncoderReranker
+    ) -> None:
         docs = [
             Document(page_content="lower score", metadata={}),
             Document(page_content="higher score", metadata={}),
         ]
+        # _get_model returns an already-loaded model as-is
+        ce_reranker._model = _FakePredict([0.2, 0.9])
 
-        reranker = CrossEncoderReranker(
-            model_name="cross-encoder/ms-marco-MiniLM-L-6-v2"
-        )
-        reranker._get_model = lambda: type(
-            "FakeModel", (), {"predict": staticmethod(lambda pairs: [0.2, 0.9])}
-        )()
-
-        out = reranker.rerank("query", docs, top_k=2)
+        out = ce_reranker.rerank("query", docs, top_k=2)
         assert [d.page_content for d in out] == ["higher score", "lower score"]
         assert out[0].metadata["retrieval_rank"] == 2
         assert out[0].metadata["rerank_rank"] == 1
 
-    def test_respects_top_k(self) -> None:
+    def test_respects_top_k(self, ce_reranker: CrossEncoderReranker) -> None:
         docs = [
             Document(page_content=f"doc{i}", metadata={})
             for i in range(1, 6)
         ]
-        reranker = CrossEncoderReranker(
-            model_name="cross-encoder/ms-marco-MiniLM-L-6-v2",
-            max_candidates=5,
-        )
-        reranker._get_model = lambda: type(
-            "FakeModel", (), {"predict": staticmethod(lambda pairs: [0.1, 0.2, 0.3, 0.4, 0.5])}
-        )()
+        ce_reranker._model = _FakePredict([0.1, 0.2, 0.3, 0.4, 0.5])
 
-        out = reranker.rerank("query", docs, top_k=3)
+        out = ce_reranker.rerank("query", docs, top_k=3)
         assert len(out) == 3
         assert [d.page_content for d in out] == ["doc5", "doc4", "doc3"]
+
+
+class TestModelLoading:
+    def test_onnx_export_failure_falls_back_to_cross_encoder(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A broken export must not leave the service on the no-op reranker."""
+
+        def broken_export(self: CrossEncoderReranker) -> None:
+            raise OSError("no space left on device")
+
+        class CrossEncoder(_FakePredict):
+            def __init__(self, model_name: str) -> None:
+                super().__init__([1.0])
+
+        monkeypatch.setattr(CrossEncoderReranker, "_load_onnx_model", broken_export)
+        monkeypatch.setitem(
+            sys.modules,
+            "sentence_transformers",
+            types.SimpleNamespace(CrossEncoder=CrossEncoder),
+        )
+
+        reranker = CrossEncoderReranker(model_name="m")
+        reranker.ensure_ready()
+
+        assert isinstance(reranker._model, CrossEncoder)
+
+
+class TestONNXCrossEncoder:
+    def test_predict_applies_sigmoid_to_single_logit(self) -> None:
+        import numpy as np
+
+        captured: dict = {}
+
+        def fake_tokenizer(queries, texts, **kwargs):
+            captured["queries"] = queries
+            captured["texts"] = texts
+            return {"input_ids": np.zeros((2, 4), dtype=np.int64)}
+
+        def fake_model(**features):
+            return _FakeOutput(np.array([[0.0], [2.0]], dtype=np.float32))
+
+        model = _ONNXCrossEncoder(fake_model, fake_tokenizer)
+        scores = model.predict([("q", "doc a"), ("q", "doc b")])
+
+        assert captured["queries"] == ["q", "q"]
+        assert captured["texts"] == ["doc a", "doc b"]
+        assert scores[0] == 0.5
+        assert scores[1] > scores[0]
+
+    def test_predict_empty_pairs(self) -> None:
+        model = _ONNXCrossEncoder(model=None, tokenizer=None)
+        assert model.predict([]) == []
@@ -5,12 +5,7 @@ from unittest.mock import patch
 
 import pytest
 
-import sys
-
-REPO_ROOT = Path(__file__).resolve().parents[2]
-sys.path.insert(0, str(REPO_ROOT / "scripts"))
-
-from retrieval_eval_lib import (  # noqa: E402
+from retrieval_eval_lib import (
     build_reranker,
     load_golden_queries,
     _first_relevant_rank,
@@ -38,13 +33,19 @@ class TestRankMatching:
         assert _first_relevant_rank(["a.md", "b.md"], ["missing"]) is None
 
 
+@pytest.fixture(scope="session")
+def golden_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A one-query golden set, written once per session. Read-only."""
+    path = tmp_path_factory.mktemp("golden") / "golden.json"
+    path.write_text(
+        '[{"query":"What is monitoring?","expected_sources":["monitoring"]}]'
+    )
+    return path
+
+
 class TestGoldenLoading:
-    def test_load_golden_queries(self, tmp_path: Path) -> None:
-        file_path = tmp_path / "golden.json"
-        file_path.write_text(
-            '[{"query":"What is monitoring?","expected_sources":["monitoring"]}]'
-        )
-        loaded = load_golden_queries(file_path)
+    def test_load_golden_queries(self, golden_file: Path) -> None:
+        loaded = load_golden_queries(golden_file)
         assert len(loaded) == 1
         assert loaded[0].query == "What is monitoring?"
         assert loaded[0].expected_sources == ["monitoring"]
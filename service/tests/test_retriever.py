@@ -4,12 +4,20 @@ chromadb is stubbed in conftest.py (sys.modules) to avoid the Pydantic V1
 crash on Python 3.14. All external deps (GCP auth, Vertex AI) are mocked.
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+import requests
 
 from app.config import Settings
-from app.rag.retriever import ChromaDBRetriever
+from app.rag.retriever import (
+    ChromaDBRetriever,
+    _fetch_metadata_id_token,
+    _load_embedding_model,
+    _token_expiry_epoch,
+    clear_query_embedding_cache,
+    clear_token_cache,
+)
 
 
 @pytest.fixture
@@ -17,43 +25,103 @@ def retriever(settings: Settings) -> ChromaDBRetriever:
     return ChromaDBRetriever(settings=settings)
 
 
+class _FakeCollection:
+    """The one chromadb Collection method the retriever calls.
+
+    Tests set ``next_result``; each query's keyword arguments are kept in
+    ``calls``.
+    """
+
+    __slots__ = ("next_result", "calls")
+
+    def __init__(self) -> None:
+        self.next_result: dict = {
+            "documents": [[]],
+            "metadatas": [[]],
+            "distances": [[]],
+        }
+        self.calls: list[dict] = []
+
+    def query(self, **kwargs: object) -> dict:
+        self.calls.append(kwargs)
+        return self.next_result
+
+
 @pytest.fixture
-def mock_chromadb_collection() -> MagicMock:
-    return MagicMock()
+def collection() -> _FakeCollection:
+    return _FakeCollection()
+
+
+class _FakeEmbedding:
+    values = [0.1] * 768
+
+
+class _FakeEmbeddingModel:
+    """TextEmbeddingModel instance stand-in that counts embedding calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_embeddings(self, texts: list[str]) -> list[_FakeEmbedding]:
+        self.calls += 1
+        return [_FakeEmbedding()]
+
+
+class _FakeTextEmbeddingModel:
+    """vertexai TextEmbeddingModel stand-in; counts model loads."""
+
+    loads = 0
+
+    @classmethod
+    def from_pretrained(cls, name: str) -> _FakeEmbeddingModel:
+        cls.loads += 1
+        return _FakeEmbeddingModel()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patch_gcp():
+    """Stub GCP auth and Vertex AI once for the module.
+
+    Tests that care about a specific auth outcome patch over these.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        # Off GCP: no metadata server, so auth goes through the fallbacks.
+        mp.setattr("app.rag.retriever._fetch_metadata_id_token", lambda audience: None)
+        mp.setattr(
+            "google.oauth2.id_token.fetch_id_token",
+            lambda request, audience: "fake-id-token",
+        )
+        mp.setattr("vertexai.init", lambda **kwargs: None)
+        mp.setattr("vertexai.language_models.TextEmbeddingModel", _FakeTextEmbeddingModel)
+        yield
 
 
 @pytest.fixture(autouse=True)
-def _patch_externals(mock_chromadb_collection: MagicMock):
-    """Patch GCP auth and Vertex AI for all retriever tests."""
+def _patch_externals(
+    collection: _FakeCollection, monkeypatch: pytest.MonkeyPatch
+):
+    """Fresh ChromaDB client mock and empty caches for each test."""
     import chromadb  # this is our stub from conftest
 
     mock_client = MagicMock()
-    mock_client.get_collection.return_value = mock_chromadb_collection
-    chromadb.HttpClient = MagicMock(return_value=mock_client)
+    mock_client.get_collection.return_value = collection
+    monkeypatch.setattr(chromadb, "HttpClient", MagicMock(return_value=mock_client))
 
-    with (
-        patch(
-            "google.oauth2.id_token.fetch_id_token",
-            return_value="fake-id-token",
-        ),
-        patch("vertexai.init"),
-        patch("vertexai.language_models.TextEmbeddingModel") as mock_embed_cls,
-    ):
-        mock_embedding = MagicMock()
-        mock_embedding.values = [0.1] * 768
-        mock_model = MagicMock()
-        mock_model.get_embeddings.return_value = [mock_embedding]
-        mock_embed_cls.from_pretrained.return_value = mock_model
-        yield
+    _FakeTextEmbeddingModel.loads = 0
+    # Module-level caches would otherwise leak models between tests.
+    _load_embedding_model.cache_clear()
+    clear_query_embedding_cache()
+    clear_token_cache()
+    yield
 
 
 class TestChromaDBRetriever:
     def test_retrieve_returns_documents(
         self,
         retriever: ChromaDBRetriever,
-        mock_chromadb_collection: MagicMock,
+        collection: _FakeCollection,
     ) -> None:
-        mock_chromadb_collection.query.return_value = {
+        collection.next_result = {
             "documents": [["chunk one", "chunk two"]],
             "metadatas": [[{"source": "doc.md"}, {"source": "doc.md"}]],
             "distances": [[0.5, 1.2]],
@@ -67,16 +135,16 @@ class TestChromaDBRetriever:
         assert "similarity_score" in docs[0].metadata
         # Closer distance should yield higher similarity
         assert docs[0].metadata["similarity_score"] > docs[1].metadata["similarity_score"]
-        mock_chromadb_collection.query.assert_called_once()
-        kwargs = mock_chromadb_collection.query.call_args.kwargs
+        assert len(collection.calls) == 1
+        kwargs = collection.calls[0]
         assert kwargs["n_results"] == retriever.settings.retrieval_candidate_k
 
     def test_retrieve_empty_results(
         self,
         retriever: ChromaDBRetriever,
-        mock_chromadb_collection: MagicMock,
+        collection: _FakeCollection,
     ) -> None:
-        mock_chromadb_collection.query.return_value = {
+        collection.next_result = {
             "documents": [[]],
             "metadatas": [[]],
             "distances": [[]],
@@ -88,10 +156,10 @@ class TestChromaDBRetriever:
     def test_similarity_score_calculation(
         self,
         retriever: ChromaDBRetriever,
-        mock_chromadb_collection: MagicMock,
+        collection: _FakeCollection,
     ) -> None:
         """Distance 0 -> similarity 1.0, large distance -> near 0."""
-        mock_chromadb_collection.query.return_value = {
+        collection.next_result = {
             "documents": [["perfect match", "distant match"]],
             "metadatas": [[{}, {}]],
             "distances": [[0.0, 100.0]],
@@ -100,13 +168,16 @@ class TestChromaDBRetriever:
         docs = retriever.invoke("test")
         assert docs[0].metadata["similarity_score"] == 1.0
         assert docs[1].metadata["similarity_score"] < 0.02
+        # Plain floats, not numpy scalars — metadata is JSON-serialized.
+        assert type(docs[0].metadata["similarity_score"]) is float
+        assert type(docs[1].metadata["distance"]) is float
 
     def test_source_falls_back_to_filename(
         self,
         retriever: ChromaDBRetriever,
-        mock_chromadb_collection: MagicMock,
+        collection: _FakeCollection,
     ) -> None:
-        mock_chromadb_collection.query.return_value = {
+        collection.next_result = {
             "documents": [["chunk"]],
             "metadatas": [[{"filename": "uploads/2026/02/16/test.md"}]],
             "distances": [[0.4]],
@@ -119,9 +190,9 @@ class TestChromaDBRetriever:
     def test_falls_back_to_gcloud_identity_token_when_adc_missing(
         self,
         retriever: ChromaDBRetriever,
-        mock_chromadb_collection: MagicMock,
+        collection: _FakeCollection,
     ) -> None:
-        mock_chromadb_collection.query.return_value = {
+        collection.next_result = {
             "documents": [["chunk"]],
             "metadatas": [[{"source": "doc.md"}]],
             "distances": [[0.5]],
@@ -136,3 +207,256 @@ class TestChromaDBRetriever:
             retriever.invoke("test")
 
         mock_cmd.assert_called_once()
+
+    def test_prefers_metadata_server_token(
+        self,
+        retriever: ChromaDBRetriever,
+        collection: _FakeCollection,
+    ) -> None:
+        import chromadb
+
+        collection.next_result = {
+            "documents": [[]],
+            "metadatas": [[]],
+            "distances": [[]],
+        }
+        with (
+            patch(
+                "app.rag.retriever._fetch_metadata_id_token",
+                return_value="metadata-token",
+            ),
+            patch("google.oauth2.id_token.fetch_id_token") as mock_adc,
+        ):
+            retriever.invoke("test")
+
+        mock_adc.assert_not_called()
+        headers = chromadb.HttpClient.call_args.kwargs["headers"]
+        assert headers["Authorization"] == "Bearer metadata-token"
+
+    def test_warm_up_loads_model_and_token(
+        self,
+        retriever: ChromaDBRetriever,
+    ) -> None:
+        with patch(
+            "google.oauth2.id_token.fetch_id_token",
+            return_value="warm-token",
+        ) as mock_fetch:
+            retriever.warm_up()
+            retriever.warm_up()
+
+        mock_fetch.assert_called_once()
+        assert _FakeTextEmbeddingModel.loads == 1
+
+    def test_reuses_client_and_collection_across_queries(
+        self,
+        retriever: ChromaDBRetriever,
+        collection: _FakeCollection,
+    ) -> None:
+        import chromadb
+
+        collection.next_result = {
+            "documents": [["chunk"]],
+            "metadatas": [[{"source": "doc.md"}]],
+            "distances": [[0.5]],
+        }
+
+        retriever.invoke("first")
+        retriever.invoke("second")
+
+        chromadb.HttpClient.assert_called_once()
+        chromadb.HttpClient.return_value.get_collection.assert_called_once()
+
+    def test_repeated_query_embedding_is_cached(
+        self,
+        retriever: ChromaDBRetriever,
+        collection: _FakeCollection,
+    ) -> None:
+        collection.next_result = {
+            "documents": [[]],
+            "metadatas": [[]],
+            "distances": [[]],
+        }
+
+        retriever.invoke("same question")
+        retriever.invoke("same question")
+        retriever.invoke("different question")
+
+        model = retriever._get_embedding_model()
+        assert model.calls == 2
+        vector = collection.calls[-1]["query_embeddings"][0]
+        assert isinstance(vector, list)
+
+    def test_cached_embedding_is_compact_and_read_only(
+        self,
+        settings: Settings,
+    ) -> None:
+        import numpy as np
+
+        from app.rag.retriever import _embed_text
+
+        cached = _embed_text(settings.gcp_project, settings.gcp_region, "q")
+        assert cached.dtype == np.float32
+        with pytest.raises(ValueError):
+            cached[0] = 1.0
+
+    def test_token_is_shared_across_retriever_instances(
+        self,
+        settings: Settings,
+        collection: _FakeCollection,
+    ) -> None:
+        collection.next_result = {
+            "documents": [[]],
+            "metadatas": [[]],
+            "distances": [[]],
+        }
+        with patch(
+            "google.oauth2.id_token.fetch_id_token",
+            return_value="shared-token",
+        ) as mock_fetch:
+            ChromaDBRetriever(settings=settings).invoke("first")
+            ChromaDBRetriever(settings=settings).invoke("second")
+
+        mock_fetch.assert_called_once()
+
+    def test_rotated_token_rebuilds_client(
+        self,
+        retriever: ChromaDBRetriever,
+        collection: _FakeCollection,
+    ) -> None:
+        import chromadb
+
+        collection.next_result = {
+            "documents": [[]],
+            "metadatas": [[]],
+            "distances": [[]],
+        }
+
+        retriever.invoke("first")
+        clear_token_cache()
+        with patch(
+            "google.oauth2.id_token.fetch_id_token",
+            return_value="rotated-token",
+        ):
+            retriever.invoke("second")
+
+        assert chromadb.HttpClient.call_count == 2
+        headers = chromadb.HttpClient.call_args.kwargs["headers"]
+        assert headers["Authorization"] == "Bearer rotated-token"
+
+
+class TestChromaDBRetrieverAsync:
+    async def test_ainvoke_uses_async_client(
+        self,
+        retriever: ChromaDBRetriever,
+    ) -> None:
+        import chromadb
+
+        async_collection = MagicMock()
+        async_collection.query = AsyncMock(
+            return_value={
+                "documents": [["chunk one"]],
+                "metadatas": [[{"source": "doc.md"}]],
+                "distances": [[0.5]],
+            }
+        )
+        async_client = MagicMock()
+        async_client.get_collection = AsyncMock(return_value=async_collection)
+
+        with patch.object(
+            chromadb, "AsyncHttpClient", AsyncMock(return_value=async_client), create=True
+        ) as mock_async_http:
+            docs = await retriever.ainvoke("what is AdGuard?")
+
+        assert [d.page_content for d in docs] == ["chunk one"]
+        assert docs[0].metadata["similarity_score"] == round(1 / 1.5, 4)
+        headers = mock_async_http.call_args.kwargs["headers"]
+        assert headers["Authorization"] == "Bearer fake-id-token"
+        async_collection.query.assert_awaited_once()
+
+    async def test_async_client_and_collection_are_reused(
+        self,
+        retriever: ChromaDBRetriever,
+    ) -> None:
+        import chromadb
+
+        async_collection = MagicMock()
+        async_collection.query = AsyncMock(
+            return_value={"documents": [[]], "metadatas": [[]], "distances": [[]]}
+        )
+        async_client = MagicMock()
+        async_client.get_collection = AsyncMock(return_value=async_collection)
+
+        with patch.object(
+            chromadb, "AsyncHttpClient", AsyncMock(return_value=async_client), create=True
+        ) as mock_async_http:
+            await retriever.ainvoke("first")
+            await retriever.ainvoke("second")
+
+        mock_async_http.assert_awaited_once()
+        async_client.get_collection.assert_awaited_once()
+        assert async_collection.query.await_count == 2
+
+
+class TestMetadataIdToken:
+    @pytest.fixture(autouse=True)
+    def _reset_unavailable_flag(self):
+        import app.rag.retriever as retriever_module
+
+        retriever_module._metadata_server_unavailable = False
+        yield
+        retriever_module._metadata_server_unavailable = False
+
+    def test_returns_response_text_as_token(self) -> None:
+        response = MagicMock(text="metadata-token\n")
+        with patch("requests.get", return_value=response) as mock_get:
+            token = _fetch_metadata_id_token("https://chroma.example")
+
+        assert token == "metadata-token"
+        kwargs = mock_get.call_args.kwargs
+        assert kwargs["params"] == {"audience": "https://chroma.example"}
+        assert kwargs["headers"] == {"Metadata-Flavor": "Google"}
+
+    def test_unreachable_server_is_remembered(self) -> None:
+        import requests
+
+        with patch(
+            "requests.get", side_effect=requests.ConnectionError("no metadata")
+        ) as mock_get:
+            assert _fetch_metadata_id_token("https://chroma.example") is None
+            assert _fetch_metadata_id_token("https://chroma.example") is None
+
+        mock_get.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            requests.ReadTimeout("slow"),
+            requests.ConnectTimeout("slow"),
+            requests.HTTPError("503 Service Unavailable"),
+        ],
+        ids=["read_timeout", "connect_timeout", "http_5xx"],
+    )
+    def test_transient_failure_is_retried(self, error: Exception) -> None:
+        ok = MagicMock(text="metadata-token")
+        with patch("requests.get", side_effect=[error, ok]) as mock_get:
+            assert _fetch_metadata_id_token("https://chroma.example") is None
+            assert _fetch_metadata_id_token("https://chroma.example") == "metadata-token"
+
+        assert mock_get.call_count == 2
+
+
+def _jwt_with_exp(exp: int) -> str:
+    import base64
+    import json
+
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode())
+    return f"header.{payload.decode().rstrip('=')}.signature"
+
+
+class TestTokenExpiry:
+    def test_uses_jwt_exp_claim_with_margin(self) -> None:
+        assert _token_expiry_epoch(_jwt_with_exp(2_000), now=1_000.0) == 1_940.0
+
+    def test_opaque_token_falls_back_to_default_ttl(self) -> None:
+        assert _token_expiry_epoch("ya29.opaque-access-token", now=1_000.0) == 1_000.0 + 50 * 60
+        assert _token_expiry_epoch("not-a-jwt", now=1_000.0) == 1_000.0 + 50 * 60
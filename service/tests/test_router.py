@@ -1,8 +1,15 @@
 """Tests for the heuristic query router."""
 
+import re
+
 import pytest
 
-from app.agent.router import QueryClassification, classify_query
+from app.agent.router import (
+    _METRICS_SIGNALS,
+    _RAG_SIGNALS,
+    QueryClassification,
+    classify_query,
+)
 
 
 class TestClassifyQuery:
@@ -116,3 +123,10 @@ class TestClassifyQuery:
             "response time utilization status for last week"
         )
         assert 0.0 <= result.confidence <= 1.0
+
+
+class TestSignals:
+    def test_patterns_are_compiled_at_import(self) -> None:
+        """classify_query runs per request; it must not compile per call."""
+        for pattern, _ in _METRICS_SIGNALS + _RAG_SIGNALS:
+            assert isinstance(pattern, re.Pattern)
@@ -1,84 +1,162 @@
-"""Tests for the upload router: POST /api/upload, GET /api/upload/status, GET /api/upload/recent."""
+"""Tests for the upload router: POST /api/upload and the GET status/recent/overview reads."""
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import io
+import json
+from collections.abc import Callable
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
 from fastapi import FastAPI
-from fastapi.testclient import TestClient
+from google.cloud.bigquery import Row
 
 from app.config import Settings
 from app.routers import upload
+from app.utils import file_too_large_detail
 
 
-def _make_app(settings: Settings) -> FastAPI:
-    app = FastAPI()
-    app.include_router(upload.router)
-    app.state.settings = settings
-    return app
+def _bq_row(**fields: object) -> Row:
+    """A real BigQuery Row with the given columns, in order."""
+    return Row(tuple(fields.values()), {name: i for i, name in enumerate(fields)})
+
+
+_INGESTION_SA = "ingestion@test-project.iam.gserviceaccount.com"
+
+
+def _id_token(email: str) -> str:
+    """An unsigned ID token carrying just an email claim.
+
+    The router reads claims only; Cloud Run checks signatures upstream.
+    """
+
+    def segment(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return ".".join([segment({"alg": "RS256"}), segment({"email": email}), "c2ln"])
+
+
+@pytest.fixture(autouse=True)
+def _clear_status_cache():
+    """The status caches are module-level; don't leak responses across tests."""
+    for cache in (upload._STATUS_CACHE, upload._SUCCESS_CACHE, upload._STATUS_WAITERS):
+        cache.clear()
+    yield
+    for cache in (upload._STATUS_CACHE, upload._SUCCESS_CACHE, upload._STATUS_WAITERS):
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def mock_bq(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Stand-in for the router's bigquery module; tests wire up Client()."""
+    mock = MagicMock()
+    monkeypatch.setattr(upload, "bigquery", mock)
+    return mock
+
+
+@pytest.fixture(autouse=True)
+def mock_storage(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Stand-in for the router's storage module; tests wire up Client()."""
+    mock = MagicMock()
+    monkeypatch.setattr(upload, "storage", mock)
+    return mock
+
+
+@pytest.fixture
+def mock_time(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Controls the router's clock (time.monotonic) for cache-TTL tests."""
+    mock = MagicMock()
+    monkeypatch.setattr(upload, "time", mock)
+    return mock
 
 
 @pytest.fixture
 def enabled_settings(settings: Settings) -> Settings:
     """Settings with upload and observability enabled."""
-    return Settings(
-        **{
-            **settings.model_dump(),
+    return settings.model_copy(
+        update={
             "gcs_uploads_bucket": "test-uploads-bucket",
             "bigquery_observability_dataset": "test_observability",
+            # Polls answer immediately; TestUploadNotify covers waiting
+            "upload_status_wait_seconds": 0,
         }
     )
 
 
+@pytest.fixture(scope="module")
+def app() -> FastAPI:
+    """One app with the upload router for the whole module."""
+    app = FastAPI()
+    app.include_router(upload.router)
+    return app
+
+
 @pytest.fixture
-def client(settings: Settings) -> TestClient:
+def client(
+    use_settings: Callable[[Settings], httpx.AsyncClient], settings: Settings
+) -> httpx.AsyncClient:
     """Client with upload disabled (default settings)."""
-    return TestClient(_make_app(settings))
+    return use_settings(settings)
 
 
 @pytest.fixture
-def enabled_client(enabled_settings: Settings) -> TestClient:
+def enabled_client(
+    use_settings: Callable[[Settings], httpx.AsyncClient],
+    enabled_settings: Settings,
+) -> httpx.AsyncClient:
     """Client with upload enabled."""
-    return TestClient(_make_app(enabled_settings))
+    return use_settings(enabled_settings)
 
 
 # --- POST /api/upload ---
 
 
 class TestUploadFile:
-    def test_disabled_returns_503(self, client: TestClient) -> None:
-        resp = client.post(
+    async def test_disabled_returns_503(self, client: httpx.AsyncClient) -> None:
+        resp = await client.post(
             "/api/upload",
             files={"file": ("test.md", b"# Hello", "text/markdown")},
         )
         assert resp.status_code == 503
         assert "not configured" in resp.json()["detail"]
 
-    def test_bad_extension_returns_400(self, enabled_client: TestClient) -> None:
-        resp = enabled_client.post(
+    async def test_bad_extension_returns_400(
+        self,
+        enabled_client: httpx.AsyncClient,
+    ) -> None:
+        resp = await enabled_client.post(
             "/api/upload",
             files={"file": ("malware.exe", b"evil", "application/octet-stream")},
         )
         assert resp.status_code == 400
         assert ".exe" in resp.json()["detail"]
 
-    def test_too_large_returns_400(self, enabled_settings: Settings) -> None:
-        small_limit = Settings(
-            **{**enabled_settings.model_dump(), "max_upload_size_bytes": 100}
+    async def test_too_large_returns_413(
+        self,
+        use_settings: Callable[[Settings], httpx.AsyncClient],
+        enabled_settings: Settings,
+    ) -> None:
+        small_limit = enabled_settings.model_copy(
+            update={"max_upload_size_bytes": 100}
         )
-        client = TestClient(_make_app(small_limit))
-        resp = client.post(
+        client = use_settings(small_limit)
+        resp = await client.post(
             "/api/upload",
             files={"file": ("big.md", b"x" * 200, "text/markdown")},
         )
-        assert resp.status_code == 400
-        assert "exceeds maximum size" in resp.json()["detail"]
-
-    @patch("app.routers.upload.storage")
-    def test_success(self, mock_storage: MagicMock, enabled_client: TestClient) -> None:
+        # Same contract as the body-size middleware's early rejection
+        assert resp.status_code == 413
+        assert resp.json()["detail"] == file_too_large_detail(100)
+
+    async def test_success(
+        self,
+        mock_storage: MagicMock,
+        enabled_client: httpx.AsyncClient,
+    ) -> None:
         mock_client = MagicMock()
         mock_storage.Client.return_value = mock_client
         mock_bucket = MagicMock()
@@ -86,7 +164,7 @@ class TestUploadFile:
         mock_blob = MagicMock()
         mock_bucket.blob.return_value = mock_blob
 
-        resp = enabled_client.post(
+        resp = await enabled_client.post(
             "/api/upload",
             files={"file": ("dns-setup.md", b"# DNS Setup", "text/markdown")},
         )
@@ -99,21 +177,23 @@ class TestUploadFile:
         assert data["size_bytes"] == len(b"# DNS Setup")
         assert data["status"] == "uploaded"
 
-        mock_blob.upload_from_string.assert_called_once_with(b"# DNS Setup")
+        mock_blob.upload_from_file.assert_called_once()
+        upload_call = mock_blob.upload_from_file.call_args
+        assert upload_call.kwargs["size"] == len(b"# DNS Setup")
+        assert upload_call.kwargs["rewind"] is True
 
-    @patch("app.routers.upload.storage")
-    def test_unique_object_keys(
-        self, mock_storage: MagicMock, enabled_client: TestClient
+    async def test_unique_object_keys(
+        self, mock_storage: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_storage.Client.return_value = mock_client
         mock_client.bucket.return_value.blob.return_value = MagicMock()
 
-        resp1 = enabled_client.post(
+        resp1 = await enabled_client.post(
             "/api/upload",
             files={"file": ("test.md", b"a", "text/markdown")},
         )
-        resp2 = enabled_client.post(
+        resp2 = await enabled_client.post(
             "/api/upload",
             files={"file": ("test.md", b"b", "text/markdown")},
         )
@@ -121,62 +201,62 @@ class TestUploadFile:
         assert resp2.status_code == 200
         assert resp1.json()["object_name"] != resp2.json()["object_name"]
 
-    @patch("app.routers.upload.storage")
-    def test_gcs_error_returns_500(
-        self, mock_storage: MagicMock, enabled_client: TestClient
+    async def test_gcs_error_returns_500(
+        self, mock_storage: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_storage.Client.return_value = mock_client
         mock_bucket = MagicMock()
         mock_client.bucket.return_value = mock_bucket
         mock_blob = MagicMock()
-        mock_blob.upload_from_string.side_effect = Exception("GCS down")
+        mock_blob.upload_from_file.side_effect = Exception("GCS down")
         mock_bucket.blob.return_value = mock_blob
 
-        resp = enabled_client.post(
+        resp = await enabled_client.post(
             "/api/upload",
             files={"file": ("test.md", b"# Hello", "text/markdown")},
         )
         assert resp.status_code == 500
 
-    def test_no_file_returns_422(self, enabled_client: TestClient) -> None:
-        resp = enabled_client.post("/api/upload")
+    async def test_no_file_returns_422(self, enabled_client: httpx.AsyncClient) -> None:
+        resp = await enabled_client.post("/api/upload")
         assert resp.status_code == 422
 
-    @patch("app.routers.upload.storage")
-    def test_dockerfile_accepted(
-        self, mock_storage: MagicMock, enabled_client: TestClient
+    async def test_dockerfile_accepted(
+        self, mock_storage: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         """Dotless filenames like 'Dockerfile' should match against the allowlist."""
         mock_client = MagicMock()
         mock_storage.Client.return_value = mock_client
         mock_client.bucket.return_value.blob.return_value = MagicMock()
 
-        resp = enabled_client.post(
+        resp = await enabled_client.post(
             "/api/upload",
             files={"file": ("Dockerfile", b"FROM python:3.12", "application/octet-stream")},
         )
         assert resp.status_code == 200
         assert resp.json()["file_name"] == "Dockerfile"
 
-    def test_unknown_dotless_rejected(self, enabled_client: TestClient) -> None:
+    async def test_unknown_dotless_rejected(
+        self,
+        enabled_client: httpx.AsyncClient,
+    ) -> None:
         """Unknown dotless filenames are rejected."""
-        resp = enabled_client.post(
+        resp = await enabled_client.post(
             "/api/upload",
             files={"file": ("Makefile", b"all:", "application/octet-stream")},
         )
         assert resp.status_code == 400
         assert "not supported" in resp.json()["detail"]
 
-    @patch("app.routers.upload.storage")
-    def test_path_traversal_sanitized(
-        self, mock_storage: MagicMock, enabled_client: TestClient
+    async def test_path_traversal_sanitized(
+        self, mock_storage: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_storage.Client.return_value = mock_client
         mock_client.bucket.return_value.blob.return_value = MagicMock()
 
-        resp = enabled_client.post(
+        resp = await enabled_client.post(
             "/api/upload",
             files={"file": ("../../etc/passwd.md", b"hack", "text/markdown")},
         )
@@ -186,35 +266,86 @@ class TestUploadFile:
         assert obj_name.endswith("passwd.md")
 
 
+class TestSanitizeFilename:
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            ("DNS Setup.md", "dns_setup.md"),
+            ("a  __ b.md", "a_b.md"),
+            ("C:\\Users\\me\\notes.md", "notes.md"),
+            ("../../etc/passwd.md", "passwd.md"),
+            ("__.__", "."),
+            ("???", "unnamed"),
+        ],
+    )
+    def test_sanitizes(self, raw: str, expected: str) -> None:
+        assert upload._sanitize_filename(raw) == expected
+
+
+class TestGetExtension:
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            ("notes.MD", "md"),
+            ("archive.tar.gz", "gz"),
+            ("Dockerfile", "dockerfile"),
+            ("conf.d/Dockerfile", "dockerfile"),
+            ("C:\\docs.v2\\Makefile", "makefile"),
+        ],
+    )
+    def test_extension(self, raw: str, expected: str) -> None:
+        assert upload._get_extension(raw) == expected
+
+
+class TestUploadSize:
+    """Size is measured without reading the whole upload into memory."""
+
+    async def test_counts_chunks_when_size_unknown(self) -> None:
+        from fastapi import UploadFile
+
+        file = UploadFile(io.BytesIO(b"x" * 10), filename="a.md")
+        assert file.size is None
+
+        assert await upload._upload_size(file, limit=100) == 10
+        # Rewound for the GCS upload
+        assert await file.read() == b"x" * 10
+
+    async def test_stops_reading_past_limit(self) -> None:
+        from fastapi import UploadFile
+
+        file = UploadFile(io.BytesIO(b"x" * 10), filename="a.md")
+        assert await upload._upload_size(file, limit=5) is None
+
+
 # --- GET /api/upload/status ---
 
 
 class TestUploadStatus:
-    def test_disabled_returns_503(self, client: TestClient) -> None:
-        resp = client.get("/api/upload/status", params={"file_name": "test.md"})
+    async def test_disabled_returns_503(self, client: httpx.AsyncClient) -> None:
+        resp = await client.get("/api/upload/status", params={"file_name": "test.md"})
         assert resp.status_code == 503
 
-    @patch("app.routers.upload.bigquery")
-    def test_found_success(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_found_success(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_bq.Client.return_value = mock_client
         mock_bq.QueryJobConfig = MagicMock()
         mock_bq.ScalarQueryParameter = MagicMock()
 
-        mock_row = MagicMock()
-        mock_row.file_name = "uploads/2026/02/15/abc-test.md"
-        mock_row.file_type = "md"
-        mock_row.status = "success"
-        mock_row.chunk_count = 8
-        mock_row.chunks_sanitized = 3
-        mock_row.total_time_ms = 1200.5
-        mock_row.error_message = None
-        mock_row.timestamp = datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc)
-        mock_client.query.return_value.result.return_value = [mock_row]
-
-        resp = enabled_client.get(
+        mock_row = _bq_row(
+            file_name="uploads/2026/02/15/abc-test.md",
+            file_type="md",
+            status="success",
+            chunk_count=8,
+            chunks_sanitized=3,
+            total_time_ms=1200.5,
+            error_message=None,
+            timestamp=datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
+        )
+        mock_client.query_and_wait.return_value = [mock_row]
+
+        resp = await enabled_client.get(
             "/api/upload/status",
             params={"file_name": "uploads/2026/02/15/abc-test.md"},
         )
@@ -223,89 +354,513 @@ class TestUploadStatus:
         assert data["status"] == "success"
         assert data["chunk_count"] == 8
 
-    @patch("app.routers.upload.bigquery")
-    def test_found_error(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_found_error(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_bq.Client.return_value = mock_client
         mock_bq.QueryJobConfig = MagicMock()
         mock_bq.ScalarQueryParameter = MagicMock()
 
-        mock_row = MagicMock()
-        mock_row.file_name = "test.md"
-        mock_row.file_type = "md"
-        mock_row.status = "error"
-        mock_row.chunk_count = None
-        mock_row.chunks_sanitized = None
-        mock_row.total_time_ms = None
-        mock_row.error_message = "Parsing failed"
-        mock_row.timestamp = datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc)
-        mock_client.query.return_value.result.return_value = [mock_row]
-
-        resp = enabled_client.get(
+        mock_row = _bq_row(
+            file_name="test.md",
+            file_type="md",
+            status="error",
+            chunk_count=None,
+            chunks_sanitized=None,
+            total_time_ms=None,
+            error_message="Parsing failed",
+            timestamp=datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
+        )
+        mock_client.query_and_wait.return_value = [mock_row]
+
+        resp = await enabled_client.get(
             "/api/upload/status", params={"file_name": "test.md"}
         )
         assert resp.status_code == 200
         assert resp.json()["status"] == "error"
 
-    @patch("app.routers.upload.bigquery")
-    def test_processing_no_rows(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_processing_no_rows(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_bq.Client.return_value = mock_client
         mock_bq.QueryJobConfig = MagicMock()
         mock_bq.ScalarQueryParameter = MagicMock()
-        mock_client.query.return_value.result.return_value = []
+        mock_client.query_and_wait.return_value = []
 
-        resp = enabled_client.get(
+        resp = await enabled_client.get(
             "/api/upload/status", params={"file_name": "new-file.md"}
         )
         assert resp.status_code == 200
         assert resp.json()["status"] == "processing"
 
+    @pytest.mark.parametrize(
+        ("file_name", "since"),
+        [
+            (
+                "uploads/2025/01/31/abcd1234-old.md",
+                datetime(2025, 1, 31, tzinfo=timezone.utc),
+            ),
+            ("notes.md", upload._NO_LOWER_BOUND),
+            ("uploads/2025/13/40/abcd1234-bad.md", upload._NO_LOWER_BOUND),
+        ],
+    )
+    async def test_lookup_starts_at_upload_date(
+        self,
+        mock_bq: MagicMock,
+        enabled_client: httpx.AsyncClient,
+        file_name: str,
+        since: datetime,
+    ) -> None:
+        """Old uploads are still found; dated names still prune partitions."""
+        mock_bq.Client.return_value.query_and_wait.return_value = []
+
+        await enabled_client.get("/api/upload/status", params={"file_name": file_name})
+
+        params = {
+            c.args[0]: c.args[2] for c in mock_bq.ScalarQueryParameter.call_args_list
+        }
+        assert params == {"file_name": file_name, "since": since}
+
+    async def test_sql_is_parameterized_and_shared(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        """Polls send identical SQL (file_name is a parameter) with caching on."""
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = []
+
+        await enabled_client.get("/api/upload/status", params={"file_name": "a.md"})
+        await enabled_client.get("/api/upload/status", params={"file_name": "b.md"})
+
+        first, second = mock_client.query_and_wait.call_args_list
+        assert first.args[0] == second.args[0]
+        assert "@file_name" in first.args[0]
+        assert mock_bq.QueryJobConfig.call_args.kwargs["use_query_cache"] is True
+
+
+class TestUploadStatusCache:
+    @staticmethod
+    def _row(status: str) -> Row:
+        return _bq_row(
+            file_name="a.md",
+            file_type="md",
+            status=status,
+            chunk_count=None,
+            chunks_sanitized=None,
+            total_time_ms=None,
+            error_message=None,
+            timestamp=None,
+        )
+
+    async def test_burst_of_polls_runs_one_query(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = []
+
+        for _ in range(5):
+            resp = await enabled_client.get(
+                "/api/upload/status", params={"file_name": "a.md"}
+            )
+            assert resp.json()["status"] == "processing"
+
+        assert mock_client.query_and_wait.call_count == 1
+
+    async def test_processing_expires_before_terminal(
+        self,
+        mock_bq: MagicMock,
+        mock_time: MagicMock,
+        enabled_client: httpx.AsyncClient,
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.side_effect = [[], [self._row("success")]]
+        mock_time.monotonic.return_value = 100.0
+
+        async def poll() -> str:
+            resp = await enabled_client.get(
+                "/api/upload/status", params={"file_name": "a.md"}
+            )
+            return resp.json()["status"]
+
+        assert await poll() == "processing"
+        mock_time.monotonic.return_value = 100.0 + upload._STATUS_PENDING_TTL_SECONDS
+        assert await poll() == "success"
+        # Terminal rows outlive the short pending TTL
+        mock_time.monotonic.return_value += upload._STATUS_PENDING_TTL_SECONDS * 2
+        assert await poll() == "success"
+        assert mock_client.query_and_wait.call_count == 2
+
+    async def test_success_is_kept_past_every_ttl(
+        self,
+        mock_bq: MagicMock,
+        mock_time: MagicMock,
+        enabled_client: httpx.AsyncClient,
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = [self._row("success")]
+        mock_time.monotonic.return_value = 100.0
+
+        await enabled_client.get("/api/upload/status", params={"file_name": "a.md"})
+        mock_time.monotonic.return_value += upload._STATUS_TERMINAL_TTL_SECONDS * 10
+        resp = await enabled_client.get(
+            "/api/upload/status", params={"file_name": "a.md"}
+        )
+
+        assert resp.json()["status"] == "success"
+        assert mock_client.query_and_wait.call_count == 1
+
+    async def test_error_is_rechecked_after_ttl(
+        self,
+        mock_bq: MagicMock,
+        mock_time: MagicMock,
+        enabled_client: httpx.AsyncClient,
+    ) -> None:
+        """Ingestion retries errors, so an error can still turn into success."""
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.side_effect = [
+            [self._row("error")],
+            [self._row("success")],
+        ]
+        mock_time.monotonic.return_value = 100.0
+
+        async def poll() -> str:
+            resp = await enabled_client.get(
+                "/api/upload/status", params={"file_name": "a.md"}
+            )
+            return resp.json()["status"]
+
+        assert await poll() == "error"
+        mock_time.monotonic.return_value += upload._STATUS_TERMINAL_TTL_SECONDS
+        assert await poll() == "success"
+
+    def test_success_cache_is_bounded_lru(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(upload, "_SUCCESS_CACHE_MAX_ENTRIES", 2)
+        done = {
+            name: upload.UploadStatusResponse(file_name=name, status="success")
+            for name in ("a", "b", "c")
+        }
+
+        upload._cache_status(("p", "d", "a"), done["a"])
+        upload._cache_status(("p", "d", "b"), done["b"])
+        upload._cached_status(("p", "d", "a"))  # touch: "b" is now oldest
+        upload._cache_status(("p", "d", "c"), done["c"])
+
+        assert list(upload._SUCCESS_CACHE) == [("p", "d", "a"), ("p", "d", "c")]
+
+    async def test_failures_are_not_cached(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.side_effect = [RuntimeError("boom"), []]
+
+        first = await enabled_client.get(
+            "/api/upload/status", params={"file_name": "a.md"}
+        )
+        second = await enabled_client.get(
+            "/api/upload/status", params={"file_name": "a.md"}
+        )
+
+        assert first.status_code == 500
+        assert second.json()["status"] == "processing"
+
+
+class TestUploadNotify:
+    @pytest.fixture
+    def waiting_client(
+        self,
+        use_settings: Callable[[Settings], httpx.AsyncClient],
+        enabled_settings: Settings,
+    ) -> httpx.AsyncClient:
+        settings = enabled_settings.model_copy(
+            update={
+                "upload_status_wait_seconds": 0.05,
+                "upload_notify_sa_email": _INGESTION_SA,
+            }
+        )
+        return use_settings(settings)
+
+    @staticmethod
+    async def _notify(
+        client: httpx.AsyncClient, body: dict, email: str = _INGESTION_SA
+    ) -> httpx.Response:
+        return await client.post(
+            "/internal/upload/notify",
+            json=body,
+            headers={"Authorization": f"Bearer {_id_token(email)}"},
+        )
+
+    async def test_disabled_returns_503(self, client: httpx.AsyncClient) -> None:
+        resp = await client.post(
+            "/internal/upload/notify", json={"file_name": "a.md", "status": "success"}
+        )
+        assert resp.status_code == 503
+
+    async def test_notified_status_is_served_without_bigquery(
+        self, mock_bq: MagicMock, waiting_client: httpx.AsyncClient
+    ) -> None:
+        resp = await self._notify(
+            waiting_client, {"file_name": "a.md", "status": "success", "chunk_count": 4}
+        )
+        assert resp.status_code == 204
+
+        resp = await waiting_client.get(
+            "/api/upload/status", params={"file_name": "a.md"}
+        )
+
+        assert resp.json()["status"] == "success"
+        assert resp.json()["chunk_count"] == 4
+        mock_bq.Client.return_value.query_and_wait.assert_not_called()
+
+    async def test_other_invoker_is_rejected(
+        self, mock_bq: MagicMock, waiting_client: httpx.AsyncClient
+    ) -> None:
+        frontend = "frontend@test-project.iam.gserviceaccount.com"
+        resp = await self._notify(
+            waiting_client, {"file_name": "a.md", "status": "success"}, frontend
+        )
+        assert resp.status_code == 403
+
+        resp = await waiting_client.post(
+            "/internal/upload/notify", json={"file_name": "a.md", "status": "success"}
+        )
+        assert resp.status_code == 403
+        assert ("test-project", "test_observability", "a.md") not in (
+            upload._STATUS_CACHE
+        )
+
+    async def test_unset_notify_account_rejects_all(
+        self, enabled_client: httpx.AsyncClient
+    ) -> None:
+        resp = await self._notify(
+            enabled_client, {"file_name": "a.md", "status": "success"}
+        )
+        assert resp.status_code == 403
+
+    async def test_notified_success_expires(
+        self, mock_time: MagicMock, waiting_client: httpx.AsyncClient
+    ) -> None:
+        """A notice is held with a TTL; only BigQuery makes success permanent."""
+        mock_time.monotonic.return_value = 0.0
+        await self._notify(waiting_client, {"file_name": "a.md", "status": "success"})
+
+        key = ("test-project", "test_observability", "a.md")
+        assert key not in upload._SUCCESS_CACHE
+        assert upload._cached_status(key) is not None
+        mock_time.monotonic.return_value = upload._STATUS_TERMINAL_TTL_SECONDS + 1
+        assert upload._cached_status(key) is None
+
+    async def test_notify_wakes_waiting_poll(self) -> None:
+        key = ("p", "ds", "a.md")
+        waiter = asyncio.create_task(upload._wait_for_notify(key, timeout=5.0))
+        await asyncio.sleep(0)
+
+        upload._cache_status(
+            key, upload.UploadStatusResponse(file_name="a.md", status="success")
+        )
+        upload._wake_waiters(key)
+
+        result = await asyncio.wait_for(waiter, timeout=1.0)
+        assert result is not None and result.status == "success"
+
+    async def test_timed_out_wait_unregisters(self) -> None:
+        key = ("p", "ds", "a.md")
+
+        assert await upload._wait_for_notify(key, timeout=0.01) is None
+        assert key not in upload._STATUS_WAITERS
+
+    def test_wait_is_off_by_default(self, settings: Settings) -> None:
+        assert settings.upload_status_wait_seconds == 0
+
+    async def test_wait_times_out_to_bigquery(
+        self, mock_bq: MagicMock, waiting_client: httpx.AsyncClient
+    ) -> None:
+        """Processing in BigQuery: wait, then read BigQuery again."""
+        mock_bq.Client.return_value.query_and_wait.return_value = []
+
+        resp = await waiting_client.get(
+            "/api/upload/status", params={"file_name": "a.md"}
+        )
+
+        assert resp.json()["status"] == "processing"
+        assert mock_bq.Client.return_value.query_and_wait.call_count == 2
+
+    async def test_finished_file_is_not_held(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        mock_bq: MagicMock,
+        waiting_client: httpx.AsyncClient,
+    ) -> None:
+        """An uncached poll for an already-finished file doesn't wait."""
+        wait = AsyncMock()
+        monkeypatch.setattr(upload, "_wait_for_notify", wait)
+        mock_bq.Client.return_value.query_and_wait.return_value = [
+            _bq_row(file_name="a.md", status="success", timestamp=None)
+        ]
+
+        resp = await waiting_client.get(
+            "/api/upload/status", params={"file_name": "a.md"}
+        )
+
+        assert resp.json()["status"] == "success"
+        wait.assert_not_called()
+        mock_bq.Client.return_value.query_and_wait.assert_called_once()
+
+    async def test_timed_out_poll_leaves_other_waiters_registered(self) -> None:
+        key = ("p", "ds", "a.md")
+        patient = asyncio.create_task(upload._wait_for_notify(key, timeout=5.0))
+        await asyncio.sleep(0)
+
+        assert await upload._wait_for_notify(key, timeout=0.01) is None
+        assert key in upload._STATUS_WAITERS
+
+        upload._cache_status(
+            key, upload.UploadStatusResponse(file_name="a.md", status="success")
+        )
+        upload._wake_waiters(key)
+
+        result = await asyncio.wait_for(patient, timeout=1.0)
+        assert result is not None and result.status == "success"
+        assert key not in upload._STATUS_WAITERS
+
 
 # --- GET /api/upload/recent ---
 
 
 class TestUploadRecent:
-    def test_disabled_returns_503(self, client: TestClient) -> None:
-        resp = client.get("/api/upload/recent")
+    async def test_disabled_returns_503(self, client: httpx.AsyncClient) -> None:
+        resp = await client.get("/api/upload/recent")
         assert resp.status_code == 503
 
-    @patch("app.routers.upload.bigquery")
-    def test_returns_list(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_returns_list(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_bq.Client.return_value = mock_client
 
-        mock_row = MagicMock()
-        mock_row.file_name = "dns-setup.md"
-        mock_row.file_type = "md"
-        mock_row.status = "success"
-        mock_row.chunk_count = 5
-        mock_row.chunks_sanitized = 1
-        mock_row.total_time_ms = 800.0
-        mock_row.error_message = None
-        mock_row.timestamp = datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc)
-        mock_client.query.return_value.result.return_value = [mock_row]
-
-        resp = enabled_client.get("/api/upload/recent")
+        mock_row = _bq_row(
+            file_name="dns-setup.md",
+            file_type="md",
+            status="success",
+            chunk_count=5,
+            chunks_sanitized=1,
+            total_time_ms=800.0,
+            error_message=None,
+            timestamp=datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc),
+        )
+        mock_client.query_and_wait.return_value = [mock_row]
+
+        resp = await enabled_client.get("/api/upload/recent")
         assert resp.status_code == 200
         data = resp.json()
         assert len(data["files"]) == 1
         assert data["files"][0]["file_name"] == "dns-setup.md"
+        assert data["files"][0]["timestamp"] == "2026-02-15T12:00:00+00:00"
 
-    @patch("app.routers.upload.bigquery")
-    def test_empty_list(
-        self, mock_bq: MagicMock, enabled_client: TestClient
+    async def test_empty_list(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
     ) -> None:
         mock_client = MagicMock()
         mock_bq.Client.return_value = mock_client
-        mock_client.query.return_value.result.return_value = []
+        mock_client.query_and_wait.return_value = []
 
-        resp = enabled_client.get("/api/upload/recent")
+        resp = await enabled_client.get("/api/upload/recent")
         assert resp.status_code == 200
         assert resp.json()["files"] == []
+
+    async def test_query_is_not_time_bounded(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        """The 20 most recent of the whole table, not of some window."""
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        mock_client.query_and_wait.return_value = []
+
+        await enabled_client.get("/api/upload/recent")
+
+        assert "@since" not in mock_client.query_and_wait.call_args.args[0]
+        mock_bq.ScalarQueryParameter.assert_not_called()
+
+    async def test_bigquery_client_is_reused_across_requests(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_bq.Client.return_value.query_and_wait.return_value = []
+
+        await enabled_client.get("/api/upload/recent")
+        await enabled_client.get("/api/upload/recent")
+
+        mock_bq.Client.assert_called_once()
+
+
+class TestUploadOverview:
+    async def test_disabled_returns_503(self, client: httpx.AsyncClient) -> None:
+        resp = await client.get("/api/upload/overview")
+        assert resp.status_code == 503
+
+    async def test_status_and_recent_share_one_query(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_client = MagicMock()
+        mock_bq.Client.return_value = mock_client
+        older = datetime(2026, 2, 15, 11, 0, 0, tzinfo=timezone.utc)
+        newer = datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc)
+        mock_client.query_and_wait.return_value = [
+            _bq_row(kind="recent", file_name="a.md", status="success", timestamp=older),
+            _bq_row(kind="status", file_name="b.md", status="success", timestamp=newer),
+            _bq_row(kind="recent", file_name="b.md", status="success", timestamp=newer),
+        ]
+
+        resp = await enabled_client.get(
+            "/api/upload/overview", params={"file_name": "b.md"}
+        )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["status"]["file_name"] == "b.md"
+        assert [f["file_name"] for f in data["files"]] == ["b.md", "a.md"]
+        mock_client.query_and_wait.assert_called_once()
+        assert "UNION ALL" in mock_client.query_and_wait.call_args.args[0]
+        # The status read also answers later polls from the cache
+        resp = await enabled_client.get(
+            "/api/upload/status", params={"file_name": "b.md"}
+        )
+        assert resp.json()["status"] == "success"
+        mock_client.query_and_wait.assert_called_once()
+
+    async def test_without_file_name_returns_recent_only(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_bq.Client.return_value.query_and_wait.return_value = []
+
+        resp = await enabled_client.get("/api/upload/overview", params={"limit": 500})
+
+        assert resp.json() == {"status": None, "files": []}
+        params = {
+            c.args[0]: c.args[2] for c in mock_bq.ScalarQueryParameter.call_args_list
+        }
+        assert params["file_name"] is None
+        assert params["limit"] == upload._RECENT_LIMIT
+
+    async def test_unseen_file_is_processing(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_bq.Client.return_value.query_and_wait.return_value = []
+
+        resp = await enabled_client.get(
+            "/api/upload/overview", params={"file_name": "new.md"}
+        )
+
+        assert resp.json()["status"]["status"] == "processing"
+
+    async def test_query_failure_returns_500(
+        self, mock_bq: MagicMock, enabled_client: httpx.AsyncClient
+    ) -> None:
+        mock_bq.Client.return_value.query_and_wait.side_effect = Exception("BQ down")
+        resp = await enabled_client.get("/api/upload/overview")
+        assert resp.status_code == 500
@@ -1,23 +1,39 @@
 """Tests for the vector retrieval tool."""
 
-from unittest.mock import MagicMock
+from __future__ import annotations
 
 from langchain_core.documents import Document
 
 from app.agent.tools.vector_retrieval import create_retrieval_tool
 
 
+class _FakeRetriever:
+    """The one retriever method the tool calls.
+
+    Returns ``result`` from every invoke, or raises it if it's an exception.
+    """
+
+    __slots__ = ("result",)
+
+    def __init__(self, result: list[Document] | BaseException) -> None:
+        self.result = result
+
+    def invoke(self, query: str) -> list[Document]:
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return self.result
+
+
 class TestVectorRetrievalTool:
     def test_returns_success_with_documents(self) -> None:
-        mock_retriever = MagicMock()
-        mock_retriever.invoke.return_value = [
+        retriever = _FakeRetriever([
             Document(
                 page_content="AdGuard runs on CT 102",
                 metadata={"source": "dns.md", "similarity_score": 0.85},
             ),
-        ]
+        ])
 
-        tool_fn = create_retrieval_tool(mock_retriever)
+        tool_fn = create_retrieval_tool(retriever)
         result = tool_fn.invoke("How is AdGuard configured?")
 
         assert result["ok"] is True
@@ -26,20 +42,16 @@ class TestVectorRetrievalTool:
         assert result["data"][0]["score"] == 0.85
 
     def test_returns_empty_data_when_no_documents(self) -> None:
-        mock_retriever = MagicMock()
-        mock_retriever.invoke.return_value = []
-
-        tool_fn = create_retrieval_tool(mock_retriever)
+        tool_fn = create_retrieval_tool(_FakeRetriever([]))
         result = tool_fn.invoke("nonexistent topic")
 
         assert result["ok"] is True
         assert result["data"] == []
 
     def test_returns_error_on_retriever_failure(self) -> None:
-        mock_retriever = MagicMock()
-        mock_retriever.invoke.side_effect = ConnectionError("ChromaDB unreachable")
+        retriever = _FakeRetriever(ConnectionError("ChromaDB unreachable"))
 
-        tool_fn = create_retrieval_tool(mock_retriever)
+        tool_fn = create_retrieval_tool(retriever)
         result = tool_fn.invoke("test query")
 
         assert result["ok"] is False
@@ -47,25 +59,21 @@ class TestVectorRetrievalTool:
         assert result["data"] is None
 
     def test_multiple_documents(self) -> None:
-        mock_retriever = MagicMock()
-        mock_retriever.invoke.return_value = [
+        retriever = _FakeRetriever([
             Document(page_content="doc1", metadata={"source": "a.md", "similarity_score": 0.9}),
             Document(page_content="doc2", metadata={"source": "b.md", "similarity_score": 0.7}),
-        ]
+        ])
 
-        tool_fn = create_retrieval_tool(mock_retriever)
+        tool_fn = create_retrieval_tool(retriever)
         result = tool_fn.invoke("test")
 
         assert result["ok"] is True
         assert len(result["data"]) == 2
 
     def test_missing_metadata_defaults(self) -> None:
-        mock_retriever = MagicMock()
-        mock_retriever.invoke.return_value = [
-            Document(page_content="content", metadata={}),
-        ]
+        retriever = _FakeRetriever([Document(page_content="content", metadata={})])
 
-        tool_fn = create_retrieval_tool(mock_retriever)
+        tool_fn = create_retrieval_tool(retriever)
         result = tool_fn.invoke("test")
 
         assert result["ok"] is True
@@ -155,6 +155,7 @@ module "cloud_functions" {
   ingestion_sa_email    = module.iam.ingestion_sa_email
   chromadb_url          = module.chromadb.service_url
   bigquery_table_id     = module.bigquery.ingestion_log_table_id
+  status_notify_url     = module.cloud_run_rag.service_url
 
   depends_on = [module.chromadb, module.bigquery, module.iam]
 }
@@ -176,11 +177,14 @@ module "cloud_run_rag" {
   bigquery_observability_dataset = module.bigquery.dataset_id
   frontend_sa_email              = module.iam.frontend_sa_email
   gateway_sa_email               = module.iam.gateway_sa_email
+  ingestion_sa_email             = module.iam.ingestion_sa_email
   retrieval_candidate_k          = var.retrieval_candidate_k
   retrieval_final_k              = var.retrieval_final_k
   rerank_enabled                 = var.rerank_enabled
   reranker_model                 = var.reranker_model
   reranker_max_candidates        = var.reranker_max_candidates
+  # The ingestion function notifies this service (status_notify_url above)
+  upload_status_wait_seconds     = 2
 
   depends_on = [module.chromadb, module.bigquery, module.iam, module.gcs]
 }
@@ -464,3 +464,68 @@ resource "google_bigquery_table" "service_inventory" {
     },
   ])
 }
+
+# --- Dashboard rollups ---
+# Daily pre-aggregates behind /api/dashboard/overview. BigQuery refreshes
+# them incrementally, so a dashboard load scans one row per service/day
+# instead of a week of raw events. Averages are stored as sum + count so
+# they can be re-aggregated across days.
+
+resource "google_bigquery_table" "query_log_daily" {
+  dataset_id          = google_bigquery_dataset.platform_observability.dataset_id
+  table_id            = "query_log_daily"
+  project             = var.project_id
+  deletion_protection = false
+  description         = "Daily query_log rollup for the dashboard (materialized view)"
+
+  time_partitioning {
+    type  = "DAY"
+    field = "day"
+  }
+
+  materialized_view {
+    enable_refresh      = true
+    refresh_interval_ms = 300000 # 5 minutes
+    query               = <<-SQL
+      SELECT TIMESTAMP_TRUNC(timestamp, DAY) AS day,
+             COUNT(*) AS total_queries,
+             COUNTIF(status = 'success') AS successful,
+             COUNTIF(status != 'success') AS failed,
+             SUM(latency_ms) AS latency_ms_sum,
+             COUNT(latency_ms) AS latency_ms_count,
+             COUNTIF(query_mode = 'rag') AS rag_queries,
+             COUNTIF(query_mode = 'metrics') AS metrics_queries,
+             COUNTIF(query_mode = 'hybrid') AS hybrid_queries
+      FROM `${var.project_id}.${google_bigquery_dataset.platform_observability.dataset_id}.${google_bigquery_table.query_log.table_id}`
+      GROUP BY day
+    SQL
+  }
+}
+
+resource "google_bigquery_table" "uptime_daily" {
+  dataset_id          = google_bigquery_dataset.infrastructure_metrics.dataset_id
+  table_id            = "uptime_daily"
+  project             = var.project_id
+  deletion_protection = false
+  description         = "Daily per-service uptime rollup for the dashboard (materialized view)"
+
+  time_partitioning {
+    type  = "DAY"
+    field = "day"
+  }
+
+  materialized_view {
+    enable_refresh      = true
+    refresh_interval_ms = 300000 # 5 minutes
+    query               = <<-SQL
+      SELECT TIMESTAMP_TRUNC(checked_at, DAY) AS day,
+             service_name,
+             COUNTIF(status = 'up') AS up_checks,
+             COUNT(*) AS total_checks,
+             SUM(response_time_ms) AS response_ms_sum,
+             COUNT(response_time_ms) AS response_ms_count
+      FROM `${var.project_id}.${google_bigquery_dataset.infrastructure_metrics.dataset_id}.${google_bigquery_table.uptime_events.table_id}`
+      GROUP BY day, service_name
+    SQL
+  }
+}
@@ -79,11 +79,12 @@ resource "google_cloudfunctions2_function" "document_ingestion" {
     service_account_email = var.ingestion_sa_email
 
     environment_variables = {
-      CHROMADB_URL   = var.chromadb_url
-      BIGQUERY_TABLE = var.bigquery_table_id
-      ENVIRONMENT    = var.environment
-      GCP_PROJECT    = var.project_id
-      GCP_LOCATION   = var.region
+      CHROMADB_URL      = var.chromadb_url
+      BIGQUERY_TABLE    = var.bigquery_table_id
+      ENVIRONMENT       = var.environment
+      GCP_PROJECT       = var.project_id
+      GCP_LOCATION      = var.region
+      STATUS_NOTIFY_URL = var.status_notify_url
     }
   }
 
@@ -37,3 +37,9 @@ variable "bigquery_table_id" {
   description = "Fully-qualified BigQuery ingestion_log table ID"
   type        = string
 }
+
+variable "status_notify_url" {
+  description = "RAG service URL notified when ingestion finishes (empty disables)"
+  type        = string
+  default     = ""
+}
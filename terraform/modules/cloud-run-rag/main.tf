@@ -156,6 +156,16 @@ resource "google_cloud_run_v2_service" "rag_service" {
         name  = "LABSIGHT_RERANKER_MAX_CANDIDATES"
         value = tostring(var.reranker_max_candidates)
       }
+
+      env {
+        name  = "LABSIGHT_UPLOAD_STATUS_WAIT_SECONDS"
+        value = tostring(var.upload_status_wait_seconds)
+      }
+
+      env {
+        name  = "LABSIGHT_UPLOAD_NOTIFY_SA_EMAIL"
+        value = var.ingestion_sa_email
+      }
     }
   }
 }
@@ -182,3 +192,14 @@ resource "google_cloud_run_v2_service_iam_member" "gateway_invoker" {
   role     = "roles/run.invoker"
   member   = "serviceAccount:${var.gateway_sa_email}"
 }
+
+# --- Ingestion function invoker binding (POST /internal/upload/notify) ---
+
+resource "google_cloud_run_v2_service_iam_member" "ingestion_invoker" {
+  count    = var.ingestion_sa_email != "" ? 1 : 0
+  project  = var.project_id
+  location = var.region
+  name     = google_cloud_run_v2_service.rag_service.name
+  role     = "roles/run.invoker"
+  member   = "serviceAccount:${var.ingestion_sa_email}"
+}
@@ -106,3 +106,15 @@ variable "reranker_max_candidates" {
   type        = number
   default     = 30
 }
+
+variable "ingestion_sa_email" {
+  description = "Ingestion function service account email for invoker binding (status notices)"
+  type        = string
+  default     = ""
+}
+
+variable "upload_status_wait_seconds" {
+  description = "Seconds a processing status poll waits for the ingestion notice (0 disables; set only when the function notifies)"
+  type        = number
+  default     = 0
+}